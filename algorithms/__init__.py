@@ -5,21 +5,55 @@ XOR_dist Algorithms Package
 from .core import (
     xor_dist, popcount, v2, vp,
     trailing_ones, odd_part,
+    available_backends, get_backend, set_backend,
+    popcount_batch, xor_dist_batch, v2_batch,
+    trailing_ones_batch, odd_part_batch,
     sieve_of_eratosthenes, is_prime,
-    twin_primes, prime_pairs_with_gap,
+    miller_rabin, strong_lucas_probable_prime, bpsw, jacobi,
+    sieve_segments, segmented_sieve, DEFAULT_SEGMENT_SIZE,
+    PrimeSieve,
+    twin_primes, prime_pairs_with_gap, primes_among,
+    wheel_twin_primes,
+    twin_primes_in_range,
+    count_twins, TWIN_PRIME_CONSTANT,
+    logarithmic_integral, hardy_littlewood_twins,
+    iter_twin_primes, iter_prime_pairs_with_gap,
+    theorem_holds, theorem_details,
     verify_theorem_single, verify_theorem_batch,
-    xor_dist_distribution, distribution_stats,
-    mersenne_primes, high_xor_dist_twins,
+    DistributionAccumulator, GapIndex,
+    xor_dist_distribution, distribution_stats, distance_stats,
+    regularized_gamma_q, chi2_sf, chi2_critical_value,
+    lucas_lehmer, mersenne_primes, high_xor_dist_twins, high_v2_twins,
+    rank_by_xor_dist,
+    random_twin_prime,
+    ExtremesCollector,
     demonstrate_theorem
 )
 
 __all__ = [
     'xor_dist', 'popcount', 'v2', 'vp',
     'trailing_ones', 'odd_part',
+    'available_backends', 'get_backend', 'set_backend',
+    'popcount_batch', 'xor_dist_batch', 'v2_batch',
+    'trailing_ones_batch', 'odd_part_batch',
     'sieve_of_eratosthenes', 'is_prime',
-    'twin_primes', 'prime_pairs_with_gap',
+    'miller_rabin', 'strong_lucas_probable_prime', 'bpsw', 'jacobi',
+    'sieve_segments', 'segmented_sieve', 'DEFAULT_SEGMENT_SIZE',
+    'PrimeSieve',
+    'twin_primes', 'prime_pairs_with_gap', 'primes_among',
+    'wheel_twin_primes',
+    'twin_primes_in_range',
+    'count_twins', 'TWIN_PRIME_CONSTANT',
+    'logarithmic_integral', 'hardy_littlewood_twins',
+    'iter_twin_primes', 'iter_prime_pairs_with_gap',
+    'theorem_holds', 'theorem_details',
     'verify_theorem_single', 'verify_theorem_batch',
-    'xor_dist_distribution', 'distribution_stats',
-    'mersenne_primes', 'high_xor_dist_twins',
+    'DistributionAccumulator', 'GapIndex',
+    'xor_dist_distribution', 'distribution_stats', 'distance_stats',
+    'regularized_gamma_q', 'chi2_sf', 'chi2_critical_value',
+    'lucas_lehmer', 'mersenne_primes', 'high_xor_dist_twins', 'high_v2_twins',
+    'rank_by_xor_dist',
+    'random_twin_prime',
+    'ExtremesCollector',
     'demonstrate_theorem'
 ]
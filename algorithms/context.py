@@ -0,0 +1,143 @@
+"""
+XOR_dist Analysis Context
+=========================
+
+Contexto de análise compartilhado: calcula sob demanda, e uma única vez por
+sessão, os primos, os primos gêmeos, o xor_dist e o v₂(p+1) de cada par
+para um limite. As rotinas de verificação e estatística recebem o contexto
+em vez de recriar essas estruturas a partir do limite.
+
+Autor: Thiago Fernandes Motta
+Data: Dezembro 2025
+"""
+
+from array import array
+from collections.abc import Sequence
+from functools import cached_property
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from core import (
+    xor_dist, v2, PrimeSieve, GapIndex, DEFAULT_SEGMENT_SIZE,
+    distance_stats, rank_by_xor_dist
+)
+from storage import load_sieve
+
+
+class TwinPairs(Sequence):
+    """
+    Sequência de pares (p, p+2) sobre um array dos menores membros: cada
+    gêmeo ocupa 8 bytes, e os pares só são montados quando lidos.
+    
+    Example:
+        >>> pairs = TwinPairs(array('Q', [3, 5, 11]))
+        >>> len(pairs), pairs[-1], list(pairs[:2])
+        (3, (11, 13), [(3, 5), (5, 7)])
+    """
+    
+    def __init__(self, lows: array):
+        self.lows = lows
+    
+    def __len__(self) -> int:
+        return len(self.lows)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return TwinPairs(self.lows[index])
+        p = self.lows[index]
+        return (p, p + 2)
+    
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return ((p, p + 2) for p in self.lows)
+    
+    def __repr__(self):
+        return f"TwinPairs({len(self):,} pares)"
+
+
+class AnalysisContext:
+    """
+    Dados memoizados de uma análise até limit.
+    
+    Example:
+        >>> ctx = AnalysisContext(10**4)
+        >>> len(ctx.twins), ctx.xor_dist_distribution[1]
+        (205, 105)
+    """
+    
+    def __init__(self, limit: int, cache_dir: Optional[str] = None,
+                 segment_size: int = DEFAULT_SEGMENT_SIZE):
+        """
+        Args:
+            limit: Limite superior (inclusivo)
+            cache_dir: Diretório do cache de crivos (None = sem cache)
+            segment_size: Tamanho do segmento do crivo
+        """
+        self.limit = limit
+        self.cache_dir = cache_dir
+        self.segment_size = segment_size
+        self._gap_pairs: Dict[int, List[Tuple[int, int]]] = {}
+    
+    @cached_property
+    def primes(self) -> PrimeSieve:
+        """Crivo compacto até limit (do cache, se configurado)."""
+        if self.cache_dir is not None:
+            return load_sieve(self.limit, self.cache_dir, self.segment_size)
+        return PrimeSieve(self.limit, self.segment_size)
+    
+    @cached_property
+    def twin_lows(self) -> array:
+        """Menores membros p dos gêmeos até limit ('Q', 8 bytes cada)."""
+        return self.primes.twin_array()
+    
+    @property
+    def twins(self) -> TwinPairs:
+        """Pares (p, p+2) de primos gêmeos até limit, montados sob demanda."""
+        return TwinPairs(self.twin_lows)
+    
+    @cached_property
+    def distances(self) -> array:
+        """xor_dist(p, p+2) de cada par, na ordem de twins."""
+        return array('B', (xor_dist(p, p + 2) for p in self.twin_lows))
+    
+    @cached_property
+    def v2_values(self) -> array:
+        """v₂(p+1) de cada par, na ordem de twins."""
+        return array('B', (v2(p + 1) for p in self.twin_lows))
+    
+    @cached_property
+    def stats(self) -> Dict:
+        """Estatísticas de xor_dist dos gêmeos (ver core.distribution_stats)."""
+        return distance_stats(self.distances)
+    
+    @property
+    def xor_dist_distribution(self) -> Dict[int, int]:
+        """Histograma {xor_dist: contagem} dos gêmeos."""
+        return self.stats.get('distribution', {})
+    
+    @cached_property
+    def gap_index(self) -> GapIndex:
+        """Gaps entre primos consecutivos até limit (uint16)."""
+        return GapIndex(self.primes)
+    
+    def pairs_with_gap(self, gap: int) -> Sequence:
+        """
+        Pares de primos consecutivos com o gap dado (memoizado por gap;
+        para gap 2, a sequência compacta twins).
+        """
+        if gap == 2:
+            return self.twins
+        if gap not in self._gap_pairs:
+            self._gap_pairs[gap] = self.gap_index.pairs_with_gap(gap)
+        return self._gap_pairs[gap]
+    
+    def high_xor_dist_twins(self, threshold: int = 4,
+                            top_k: Optional[int] = None) -> List[Tuple[int, int, int]]:
+        """
+        Gêmeos com xor_dist ≥ threshold, em ordem decrescente de xor_dist
+        (mesmo resultado de core.high_xor_dist_twins, sem recalcular).
+        """
+        candidates = ((p, p + 2, d) for p, d in zip(self.twin_lows, self.distances)
+                      if d >= threshold)
+        return rank_by_xor_dist(candidates, top_k)
+    
+    def __repr__(self):
+        return f"AnalysisContext(limit={self.limit:,})"
@@ -8,9 +8,126 @@ Autor: Thiago Fernandes Motta
 Data: Dezembro 2025
 """
 
-from typing import Iterator, Tuple, List, Dict
+from typing import Iterator, Iterable, Tuple, List, Dict, Optional
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeoutError
 from functools import lru_cache
+import heapq
+from array import array
+from itertools import compress, islice
 import math
+import os
+import random
+import time
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: sem ele os kernels em lote usam Python puro
+    np = None
+
+
+# Tamanho padrão (em inteiros) de cada segmento do crivo segmentado
+DEFAULT_SEGMENT_SIZE = 1 << 20
+
+
+# =============================================================================
+# BACKENDS DAS PRIMITIVAS DE BITS
+# =============================================================================
+#
+# As primitivas escalares (popcount, v2, trailing_ones) têm várias
+# implementações de custo constante em número de operações Python; a mais
+# rápida disponível é escolhida na importação e pode ser trocada com
+# set_backend (ou pela variável de ambiente XOR_DIST_BACKEND).
+
+# popcount e zeros à direita de cada byte (tabela de 0 é 8 zeros)
+_POPCOUNT_TABLE = bytes(bin(i).count('1') for i in range(256))
+_TRAILING_ZEROS_TABLE = bytes([8] + [(i & -i).bit_length() - 1 for i in range(1, 256)])
+
+
+def _popcount_bin(n: int) -> int:
+    return bin(n).count('1')
+
+
+def _popcount_table(n: int) -> int:
+    n = abs(n)
+    return sum(n.to_bytes((n.bit_length() + 7) // 8, 'little').translate(_POPCOUNT_TABLE))
+
+
+def _v2_lowbit(n: int) -> int:
+    # n & -n isola o bit 1 mais baixo
+    if n == 0:
+        return float('inf')
+    return (n & -n).bit_length() - 1
+
+
+def _v2_table(n: int) -> int:
+    if n == 0:
+        return float('inf')
+    k = 0
+    while not n & 0xFF:
+        n >>= 8
+        k += 8
+    return k + _TRAILING_ZEROS_TABLE[n & 0xFF]
+
+
+def _trailing_ones_lowbit(n: int) -> int:
+    # ~n & (n+1) isola o bit 0 mais baixo
+    return (~n & (n + 1)).bit_length() - 1
+
+
+def _trailing_ones_table(n: int) -> int:
+    return _v2_table(n + 1)
+
+
+_BACKENDS = {}
+if hasattr(int, 'bit_count'):  # Python ≥ 3.10
+    _BACKENDS['bit_count'] = {
+        'popcount': int.bit_count,
+        'v2': _v2_lowbit,
+        'trailing_ones': _trailing_ones_lowbit,
+    }
+_BACKENDS['lowbit'] = {
+    'popcount': _popcount_bin,
+    'v2': _v2_lowbit,
+    'trailing_ones': _trailing_ones_lowbit,
+}
+_BACKENDS['table'] = {
+    'popcount': _popcount_table,
+    'v2': _v2_table,
+    'trailing_ones': _trailing_ones_table,
+}
+
+
+def available_backends() -> List[str]:
+    """
+    Backends disponíveis neste interpretador, do mais rápido ao mais lento.
+    """
+    return list(_BACKENDS)
+
+
+def get_backend() -> str:
+    """Nome do backend em uso."""
+    return _backend
+
+
+def set_backend(name: str):
+    """
+    Seleciona a implementação das primitivas escalares.
+    
+    Args:
+        name: Um dos nomes de available_backends()
+    """
+    global _backend, _popcount, _v2, _trailing_ones
+    if name not in _BACKENDS:
+        raise ValueError(f"backend desconhecido: {name!r} "
+                         f"(disponíveis: {', '.join(_BACKENDS)})")
+    impl = _BACKENDS[name]
+    _backend = name
+    _popcount = impl['popcount']
+    _v2 = impl['v2']
+    _trailing_ones = impl['trailing_ones']
+
+
+set_backend(os.environ.get('XOR_DIST_BACKEND') or available_backends()[0])
 
 
 # =============================================================================
@@ -35,7 +152,7 @@ def xor_dist(a: int, b: int) -> int:
         >>> xor_dist(239, 241)  # 11101111 vs 11110001
         4
     """
-    return bin(a ^ b).count('1')
+    return _popcount(a ^ b)
 
 
 def popcount(n: int) -> int:
@@ -54,7 +171,7 @@ def popcount(n: int) -> int:
         >>> popcount(8)   # 1000
         1
     """
-    return bin(n).count('1')
+    return _popcount(n)
 
 
 def v2(n: int) -> int:
@@ -79,13 +196,7 @@ def v2(n: int) -> int:
         >>> v2(7)    # 111 -> 0 zeros à direita
         0
     """
-    if n == 0:
-        return float('inf')
-    k = 0
-    while n % 2 == 0:
-        k += 1
-        n //= 2
-    return k
+    return _v2(n)
 
 
 def vp(n: int, p: int) -> int:
@@ -94,19 +205,34 @@ def vp(n: int, p: int) -> int:
     
     v_p(n) = max{k ≥ 0 : p^k | n}
     
+    Usa O(log k) divisões: testa p, p², p⁴, ... e depois desce pelas
+    potências, montando k em binário.
+    
     Args:
         n: Inteiro positivo
         p: Primo
         
     Returns:
         Valorização p-ádica
+        
+    Example:
+        >>> vp(2 * 3**7, 3)
+        7
     """
+    if p == 2:
+        return _v2(n)
     if n == 0:
         return float('inf')
+    powers = []
+    q = p
+    while n % q == 0:
+        powers.append(q)
+        q *= q
     k = 0
-    while n % p == 0:
-        k += 1
-        n //= p
+    for i in range(len(powers) - 1, -1, -1):
+        if n % powers[i] == 0:
+            n //= powers[i]
+            k += 1 << i
     return k
 
 
@@ -130,13 +256,7 @@ def trailing_ones(n: int) -> int:
         >>> trailing_ones(5)   # 101 -> 1 um
         1
     """
-    if n == 0:
-        return 0
-    count = 0
-    while n & 1:
-        count += 1
-        n >>= 1
-    return count
+    return _trailing_ones(n)
 
 
 def odd_part(n: int) -> int:
@@ -155,9 +275,128 @@ def odd_part(n: int) -> int:
         >>> odd_part(8)   # 8 = 8 * 1
         1
     """
-    while n % 2 == 0:
-        n //= 2
-    return n
+    if n == 0:
+        raise ValueError("odd_part(0) não é definido")
+    return n >> _v2(n)
+
+
+# =============================================================================
+# KERNELS EM LOTE (NumPy)
+# =============================================================================
+
+# Quantidade de elementos processados por bloco nos caminhos vetorizados
+_BATCH_CHUNK = 1 << 20
+
+# Constantes do popcount SWAR em 64 bits
+if np is not None:
+    _M1 = np.uint64(0x5555555555555555)
+    _M2 = np.uint64(0x3333333333333333)
+    _M4 = np.uint64(0x0F0F0F0F0F0F0F0F)
+    _H01 = np.uint64(0x0101010101010101)
+
+
+def _as_uint64(values):
+    """
+    Converte para array uint64, ou devolve None se NumPy não estiver
+    disponível ou algum valor não couber em 64 bits.
+    """
+    if np is None:
+        return None
+    if isinstance(values, np.ndarray) and values.dtype == np.uint64:
+        return values
+    try:
+        return np.asarray(values, dtype=np.uint64)
+    except (OverflowError, TypeError, ValueError):
+        return None
+
+
+def _popcount64(x):
+    """popcount elemento a elemento de um array uint64."""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(x)
+    x = x - ((x >> np.uint64(1)) & _M1)
+    x = (x & _M2) + ((x >> np.uint64(2)) & _M2)
+    x = (x + (x >> np.uint64(4))) & _M4
+    return (x * _H01) >> np.uint64(56)
+
+
+def popcount_batch(n):
+    """
+    popcount de cada elemento (array uint64 quando NumPy está disponível).
+    
+    Example:
+        >>> [int(k) for k in popcount_batch([7, 8, 255])]
+        [3, 1, 8]
+    """
+    arr = _as_uint64(n)
+    if arr is None:
+        return [popcount(x) for x in n]
+    return _popcount64(arr).astype(np.int64)
+
+
+def xor_dist_batch(a, b):
+    """
+    xor_dist(a[i], b[i]) para cada posição.
+    
+    Example:
+        >>> [int(k) for k in xor_dist_batch([5, 239], [7, 241])]
+        [1, 4]
+    """
+    arr_a, arr_b = _as_uint64(a), _as_uint64(b)
+    if arr_a is None or arr_b is None:
+        return [xor_dist(x, y) for x, y in zip(a, b)]
+    return _popcount64(arr_a ^ arr_b).astype(np.int64)
+
+
+def v2_batch(n):
+    """
+    v₂ de cada elemento: popcount((n & -n) - 1).
+    
+    Raises:
+        ValueError: se algum elemento for 0 (v₂(0) = ∞ não cabe no array)
+        
+    Example:
+        >>> [int(k) for k in v2_batch([12, 8, 7])]
+        [2, 3, 0]
+    """
+    arr = _as_uint64(n)
+    if arr is None:
+        if any(x == 0 for x in n):
+            raise ValueError("v2_batch não é definido para 0 (v₂(0) = ∞)")
+        return [v2(x) for x in n]
+    if not arr.all():
+        raise ValueError("v2_batch não é definido para 0 (v₂(0) = ∞)")
+    lowest = arr & (~arr + np.uint64(1))
+    return _popcount64(lowest - np.uint64(1)).astype(np.int64)
+
+
+def trailing_ones_batch(n):
+    """
+    trailing_ones de cada elemento: popcount((~n & (n+1)) - 1).
+    
+    Example:
+        >>> [int(k) for k in trailing_ones_batch([7, 11, 5, 0])]
+        [3, 2, 1, 0]
+    """
+    arr = _as_uint64(n)
+    if arr is None:
+        return [trailing_ones(x) for x in n]
+    lowest_zero = ~arr & (arr + np.uint64(1))
+    return _popcount64(lowest_zero - np.uint64(1)).astype(np.int64)
+
+
+def odd_part_batch(n):
+    """
+    Parte ímpar de cada elemento: n >> v₂(n).
+    
+    Example:
+        >>> [int(k) for k in odd_part_batch([12, 8, 7])]
+        [3, 1, 7]
+    """
+    arr = _as_uint64(n)
+    if arr is None:
+        return [odd_part(x) for x in n]
+    return arr >> v2_batch(arr).astype(np.uint64)
 
 
 # =============================================================================
@@ -168,148 +407,991 @@ def sieve_of_eratosthenes(limit: int) -> List[int]:
     """
     Crivo de Eratóstenes para gerar primos até limit.
     
+    Materializa a lista completa de primos; para limites grandes prefira
+    segmented_sieve, que produz os primos sob demanda.
+    
     Args:
         limit: Limite superior (inclusivo)
         
     Returns:
         Lista de primos até limit
     """
+    return list(segmented_sieve(limit))
+
+
+def _base_primes(limit: int) -> List[int]:
+    """
+    Primos até limit por crivo simples em bytearray (usado para √N).
+    """
     if limit < 2:
         return []
+    flags = bytearray(b'\x01') * (limit + 1)
+    flags[0] = flags[1] = 0
+    for i in range(2, math.isqrt(limit) + 1):
+        if flags[i]:
+            flags[i*i::i] = bytes(len(range(i*i, limit + 1, i)))
+    return list(compress(range(limit + 1), flags))
+
+
+def _sieve_window(low: int, high: int, base_primes: List[int]) -> bytearray:
+    """
+    Crivo da janela [low, high) usando primos-base até √(high - 1).
+    
+    Returns:
+        bytearray onde flags[i] = 1 sse low + i é primo
+    """
+    size = high - low
+    flags = bytearray(b'\x01') * size
+    for n in range(low, min(2, high)):
+        flags[n - low] = 0
+    
+    for p in base_primes:
+        pp = p * p
+        if pp >= high:
+            break
+        start = max(pp, -(-low // p) * p) - low
+        flags[start::p] = bytes(len(range(start, size, p)))
+    
+    return flags
+
+
+def sieve_segments(limit: int, segment_size: int = DEFAULT_SEGMENT_SIZE,
+                   start: int = 0) -> Iterator[Tuple[int, bytearray]]:
+    """
+    Crivo de Eratóstenes segmentado sobre [start, limit].
     
-    is_prime = [True] * (limit + 1)
-    is_prime[0] = is_prime[1] = False
+    Memória de pico O(√limit + segment_size), independente de limit.
+    
+    Args:
+        limit: Limite superior (inclusivo)
+        segment_size: Quantidade de inteiros por segmento
+        start: Início do intervalo (inclusivo)
+        
+    Yields:
+        (low, flags) onde flags[i] = 1 sse low + i é primo
+    """
+    if segment_size < 1:
+        raise ValueError("segment_size deve ser positivo")
+    if limit < 2 or start > limit:
+        return
     
-    for i in range(2, int(limit**0.5) + 1):
-        if is_prime[i]:
-            for j in range(i*i, limit + 1, i):
-                is_prime[j] = False
+    base_primes = _base_primes(math.isqrt(limit))
+    low = max(start, 0)
+    while low <= limit:
+        high = min(low + segment_size, limit + 1)
+        yield low, _sieve_window(low, high, base_primes)
+        low = high
+
+
+def segmented_sieve(limit: int, segment_size: int = DEFAULT_SEGMENT_SIZE,
+                    start: int = 0) -> Iterator[int]:
+    """
+    Gera, em ordem crescente, os primos até limit usando o crivo segmentado.
     
-    return [i for i, prime in enumerate(is_prime) if prime]
+    Args:
+        limit: Limite superior (inclusivo)
+        segment_size: Quantidade de inteiros por segmento
+        start: Início do intervalo (inclusivo)
+        
+    Yields:
+        Primos até limit
+        
+    Example:
+        >>> list(segmented_sieve(30, segment_size=8))
+        [2, 3, 5, 7, 11, 13, 17, 19, 23, 29]
+    """
+    for low, flags in sieve_segments(limit, segment_size, start):
+        yield from compress(range(low, low + len(flags)), flags)
+
+
+# Tradução entre bytes 0/1 e dígitos ASCII '0'/'1' (empacotamento de bits)
+_BYTES_TO_ASCII = bytes.maketrans(b'\x00\x01', b'01')
+_ASCII_TO_BYTES = bytes.maketrans(b'01', b'\x00\x01')
+
+# Bytes do bitmap processados por vez ao iterar/contar
+_BITMAP_CHUNK = 1 << 16
+
+
+def _pack_bits(flags: bytes) -> bytes:
+    """
+    Empacota uma sequência de bytes 0/1 em bits (bit i = flags[i], little-endian).
+    """
+    if not flags:
+        return b''
+    nbytes = (len(flags) + 7) // 8
+    return int(flags[::-1].translate(_BYTES_TO_ASCII), 2).to_bytes(nbytes, 'little')
+
+
+def _unpack_bits(data: bytes) -> bytes:
+    """
+    Inverso de _pack_bits: devolve um byte 0/1 para cada bit de data.
+    """
+    if not data:
+        return b''
+    digits = format(int.from_bytes(data, 'little'), f'0{8 * len(data)}b')
+    return digits[::-1].encode('ascii').translate(_ASCII_TO_BYTES)
+
+
+class PrimeSieve:
+    """
+    Crivo compacto: um bit por número ímpar (o primo 2 é tratado à parte).
+    
+    O bit i representa o ímpar 2i + 1, de modo que o crivo até 10^9 ocupa
+    cerca de 60 MB. Pode ser usado onde se espera uma lista de primos
+    (iteração crescente) e também como a antiga lista booleana:
+    sieve[n] indica se n é primo e sieve[a:b] lista os primos em [a, b).
+    
+    Example:
+        >>> s = PrimeSieve(100)
+        >>> s.is_prime(97), s[91], s.count()
+        (True, False, 25)
+        >>> s[10:30]
+        [11, 13, 17, 19, 23, 29]
+        >>> list(s.twin_lows(50)), s.count_twins()
+        ([59, 71], 8)
+    """
+    
+    def __init__(self, limit: int, segment_size: int = DEFAULT_SEGMENT_SIZE):
+        """
+        Args:
+            limit: Limite superior (inclusivo)
+            segment_size: Tamanho do segmento usado na construção
+        """
+        # Segmentos múltiplos de 16 mantêm os ímpares de cada um alinhados a bytes
+        segment_size = -(-segment_size // 16) * 16
+        bits = bytearray()
+        for low, flags in sieve_segments(limit, segment_size):
+            bits += _pack_bits(flags[1::2])
+        self.limit = max(limit, 0)
+        # limit = 1 não gera segmentos, mas o bitmap ainda cobre o ímpar 1
+        bits += bytes(-(-((self.limit + 1) // 2) // 8) - len(bits))
+        self._bits = bits
+    
+    @classmethod
+    def from_bits(cls, limit: int, bits) -> 'PrimeSieve':
+        """
+        Cria o crivo sobre um bitmap já existente (bytes, bytearray, mmap...).
+        
+        Args:
+            limit: Limite coberto pelo bitmap
+            bits: Buffer com pelo menos ⌈(limit+1)/2 / 8⌉ bytes
+        """
+        if len(bits) * 8 < (limit + 1) // 2:
+            raise ValueError("bitmap curto demais para o limite informado")
+        sieve = cls.__new__(cls)
+        sieve.limit = limit
+        sieve._bits = bits
+        return sieve
+    
+    def extend(self, limit: int, segment_size: int = DEFAULT_SEGMENT_SIZE) -> 'PrimeSieve':
+        """
+        Devolve um novo crivo até limit reaproveitando o bitmap atual.
+        
+        Só a faixa ainda não coberta é crivada (a partir do último byte
+        completo do bitmap).
+        """
+        if limit <= self.limit:
+            return PrimeSieve.from_bits(limit, self._bits)
+        segment_size = -(-segment_size // 16) * 16
+        full = ((self.limit + 1) // 2) // 8
+        bits = bytearray(self._bits[:full])
+        for low, flags in sieve_segments(limit, segment_size, start=16 * full):
+            bits += _pack_bits(flags[1::2])
+        return PrimeSieve.from_bits(limit, bits)
+    
+    @property
+    def bits(self):
+        """Buffer do bitmap (bit i ↔ ímpar 2i + 1)."""
+        return self._bits
+    
+    @property
+    def nbytes(self) -> int:
+        """Tamanho do bitmap em bytes."""
+        return len(self._bits)
+    
+    def _check(self, n: int):
+        if n > self.limit:
+            raise ValueError(f"{n} está além do limite do crivo ({self.limit})")
+    
+    def is_prime(self, n: int) -> bool:
+        """
+        Consulta O(1) de primalidade para n ≤ limit.
+        """
+        self._check(n)
+        if n < 3:
+            return n == 2
+        if n % 2 == 0:
+            return False
+        i = n >> 1
+        return bool(self._bits[i >> 3] >> (i & 7) & 1)
+    
+    def _odd_range(self, start: int, stop: int) -> Tuple[int, int]:
+        """Índices [i0, i1) dos ímpares em [start, stop) ∩ [0, limit]."""
+        stop = min(stop, self.limit + 1)
+        return max(start, 0) // 2, max(stop, 0) // 2
+    
+    def primes(self, start: int = 0, stop: int = None) -> Iterator[int]:
+        """
+        Gera os primos em [start, stop) em ordem crescente.
+        """
+        if stop is None:
+            stop = self.limit + 1
+        if start <= 2 < min(stop, self.limit + 1):
+            yield 2
+        i0, i1 = self._odd_range(start, stop)
+        i0 = max(i0, 1)
+        chunk = 8 * _BITMAP_CHUNK
+        i = i0
+        while i < i1:
+            j = min(i1, i + chunk)
+            b0 = i >> 3
+            flags = _unpack_bits(self._bits[b0:(j + 7) >> 3])
+            offset = i - 8 * b0
+            yield from compress(range(2 * i + 1, 2 * j + 1, 2),
+                                flags[offset:offset + j - i])
+            i = j
+    
+    def count(self, start: int = 0, stop: int = None) -> int:
+        """
+        Conta os primos em [start, stop) sem materializá-los (popcount).
+        """
+        if stop is None:
+            stop = self.limit + 1
+        total = 1 if start <= 2 < min(stop, self.limit + 1) else 0
+        i0, i1 = self._odd_range(start, stop)
+        chunk = 8 * _BITMAP_CHUNK
+        i = i0
+        while i < i1:
+            j = min(i1, i + chunk)
+            b0 = i >> 3
+            word = int.from_bytes(self._bits[b0:(j + 7) >> 3], 'little')
+            word = (word >> (i - 8 * b0)) & ((1 << (j - i)) - 1)
+            total += popcount(word)
+            i = j
+        return total
+    
+    def _twin_words(self, start: int, stop: int) -> Iterator[Tuple[int, int, int]]:
+        """
+        Bitmaps dos gêmeos: o bitmap AND ele mesmo deslocado de uma posição.
+        
+        Yields:
+            (i, j, word) onde o bit k de word indica que p = 2(i+k) + 1 e
+            p + 2 são primos, para i ≤ i + k < j
+        """
+        i0, i1 = self._odd_range(start, stop)
+        # p + 2 ≤ limit  ⇔  índice de p < (limit - 1) // 2
+        i1 = min(i1, (self.limit - 1) // 2)
+        chunk = 8 * _BITMAP_CHUNK
+        i = i0
+        while i < i1:
+            j = min(i1, i + chunk)
+            b0 = i >> 3
+            word = int.from_bytes(self._bits[b0:(j >> 3) + 1], 'little') >> (i - 8 * b0)
+            yield i, j, word & (word >> 1) & ((1 << (j - i)) - 1)
+            i = j
+    
+    def twin_lows(self, start: int = 0, stop: int = None) -> Iterator[int]:
+        """
+        Gera os menores membros p dos gêmeos (p, p+2) com start ≤ p < stop
+        e p + 2 ≤ limit, direto do bitmap (sem conjunto de primos).
+        """
+        if stop is None:
+            stop = self.limit + 1
+        for i, j, word in self._twin_words(start, stop):
+            # Gêmeos são esparsos: procura os '1' nos dígitos (bit k → digits[k])
+            digits = bin(word)[:1:-1]
+            k = digits.find('1')
+            while k >= 0:
+                yield 2 * (i + k) + 1
+                k = digits.find('1', k + 1)
+    
+    def twin_array(self, start: int = 0, stop: int = None) -> array:
+        """Menores membros dos gêmeos em um array compacto ('Q', 8 bytes cada)."""
+        return array('Q', self.twin_lows(start, stop))
+    
+    def count_twins(self, start: int = 0, stop: int = None) -> int:
+        """
+        Conta os gêmeos (p, p+2) com start ≤ p < stop e p + 2 ≤ limit
+        por popcount, sem materializar os pares.
+        """
+        if stop is None:
+            stop = self.limit + 1
+        return sum(popcount(word) for i, j, word in self._twin_words(start, stop))
+    
+    def __iter__(self) -> Iterator[int]:
+        return self.primes()
+    
+    def __contains__(self, n: int) -> bool:
+        return n <= self.limit and self.is_prime(n)
+    
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            if key.step not in (None, 1):
+                raise ValueError("PrimeSieve não suporta fatias com passo")
+            start = 0 if key.start is None else key.start
+            return list(self.primes(start, key.stop))
+        return self.is_prime(key)
+    
+    def __repr__(self):
+        return f"PrimeSieve(limit={self.limit:,}, nbytes={self.nbytes:,})"
+
+
+# Primos pequenos usados na divisão por tentativa antes dos testes fortes
+_SMALL_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47,
+                 53, 59, 61, 67, 71, 73, 79, 83, 89, 97)
+
+# Com estas bases (conjunto de Jim Sinclair, 7 em vez dos 12 primeiros primos)
+# o Miller–Rabin é determinístico para todo n < 2^64; bases ≡ 0 (mod n) são puladas
+_MR_BASES_64 = (2, 325, 9375, 28178, 450775, 9780504, 1795265022)
+
+
+def _strong_probable_prime(n: int, a: int, d: int, s: int) -> bool:
+    """Teste forte de Fermat na base a, com n - 1 = d·2^s e d ímpar."""
+    x = pow(a, d, n)
+    if x == 1 or x == n - 1:
+        return True
+    for _ in range(s - 1):
+        x = x * x % n
+        if x == n - 1:
+            return True
+    return False
+
+
+def miller_rabin(n: int, bases: Tuple[int, ...] = _MR_BASES_64) -> bool:
+    """
+    Teste de Miller–Rabin nas bases dadas.
+    
+    Com as bases padrão o resultado é exato para n < 2^64; acima disso é
+    um teste de provável primo.
+    
+    Args:
+        n: Inteiro ímpar > 2
+        bases: Bases do teste
+        
+    Returns:
+        False se n é composto; True se passou em todas as bases
+    """
+    s = v2(n - 1)
+    d = (n - 1) >> s
+    for a in bases:
+        a %= n
+        if a and not _strong_probable_prime(n, a, d, s):
+            return False
+    return True
+
+
+def jacobi(a: int, n: int) -> int:
+    """
+    Símbolo de Jacobi (a/n) para n ímpar positivo.
+    
+    Example:
+        >>> jacobi(2, 7), jacobi(3, 7), jacobi(7, 21)
+        (1, -1, 0)
+    """
+    a %= n
+    result = 1
+    while a:
+        while a % 2 == 0:
+            a //= 2
+            if n % 8 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a % 4 == 3 and n % 4 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+
+def _lucas_sequence(n: int, D: int, P: int, Q: int, k: int) -> Tuple[int, int, int]:
+    """(U_k, V_k, Q^k) mod n pela cadeia binária de k (k ≥ 1)."""
+    U, V, Qk = 1, P, Q
+    for bit in bin(k)[3:]:
+        U = U * V % n
+        V = (V * V - 2 * Qk) % n
+        Qk = Qk * Qk % n
+        if bit == '1':
+            U, V = P * U + V, D * U + P * V
+            # Divisão por 2 módulo n (n ímpar)
+            if U & 1:
+                U += n
+            if V & 1:
+                V += n
+            U, V = (U >> 1) % n, (V >> 1) % n
+            Qk = Qk * Q % n
+    return U, V, Qk
+
+
+def strong_lucas_probable_prime(n: int) -> bool:
+    """
+    Teste forte de Lucas com parâmetros de Selfridge (método A).
+    
+    Args:
+        n: Inteiro ímpar > 2 sem fatores pequenos
+        
+    Returns:
+        False se n é composto; True se é provável primo de Lucas forte
+    """
+    if math.isqrt(n) ** 2 == n:
+        return False
+    
+    # Primeiro D em 5, -7, 9, -11, ... com (D/n) = -1
+    D = 5
+    while True:
+        j = jacobi(D, n)
+        if j == -1:
+            break
+        if j == 0 and abs(D) != n:
+            return False
+        D = -D - 2 if D > 0 else -D + 2
+    P, Q = 1, (1 - D) // 4
+    
+    s = v2(n + 1)
+    d = (n + 1) >> s
+    U, V, Qk = _lucas_sequence(n, D, P, Q, d)
+    if U == 0 or V == 0:
+        return True
+    for _ in range(s - 1):
+        V = (V * V - 2 * Qk) % n
+        if V == 0:
+            return True
+        Qk = Qk * Qk % n
+    return False
+
+
+def bpsw(n: int) -> bool:
+    """
+    Teste de Baillie–PSW: Miller–Rabin na base 2 + Lucas forte.
+    
+    Não há contra-exemplo conhecido; é exato para n < 2^64.
+    
+    Args:
+        n: Inteiro ímpar > 2
+        
+    Returns:
+        True se n é (provável) primo
+    """
+    return miller_rabin(n, (2,)) and strong_lucas_probable_prime(n)
 
 
 def is_prime(n: int) -> bool:
     """
-    Teste de primalidade (determinístico para n pequeno).
+    Teste de primalidade.
+    
+    Divisão pelos primos até 97, depois Miller–Rabin determinístico
+    (n < 2^64) ou BPSW (n ≥ 2^64).
     
     Args:
         n: Inteiro a testar
         
     Returns:
         True se n é primo
+        
+    Example:
+        >>> is_prime(2**61 - 1), is_prime(2**607 - 1), is_prime(2**64 + 1)
+        (True, True, False)
     """
     if n < 2:
         return False
-    if n == 2:
-        return True
-    if n % 2 == 0:
-        return False
-    if n < 9:
+    for p in _SMALL_PRIMES:
+        if n % p == 0:
+            return n == p
+    if n < 101 * 101:
         return True
-    if n % 3 == 0:
-        return False
+    if n < 2**64:
+        return miller_rabin(n)
+    return bpsw(n)
+
+
+# Pré-crivo de primes_among. Candidatos de ≥ _PRESIEVE_LARGE_BITS bits: grupos
+# com ≥ _PRESIEVE_DENSE candidatos em _PRESIEVE_WINDOW inteiros são crivados
+# pelos primos até _PRESIEVE_BOUND, e os isolados passam por um gcd com um
+# primorial menor. Candidatos menores, cujo teste forte é barato, só são
+# crivados em grupos de ≥ _PRESIEVE_DENSE_SMALL; os demais vão a is_prime
+_PRESIEVE_BOUND = 1 << 16
+_PRESIEVE_WINDOW = 1 << 16
+_PRESIEVE_LARGE_BITS = 256
+_PRESIEVE_DENSE = 256
+_PRESIEVE_DENSE_SMALL = 1024
+
+
+@lru_cache(maxsize=8)
+def _primorial(bound: int) -> int:
+    """Produto dos primos até bound."""
+    return math.prod(_base_primes(bound))
+
+
+def _sparse_presieve_bound(n: int) -> int:
+    """
+    Limite do primorial para um candidato isolado do tamanho de n: o gcd
+    custa O(limite) e o teste forte O(bits³), então o limite cresce devagar.
+    """
+    return 1 << min(16, max(10, n.bit_length().bit_length() + 2))
+
+
+def primes_among(candidates: Iterable[int], sieved: int = 0,
+                 base2_checked: bool = False) -> List[int]:
+    """
+    Os primos entre os candidatos, na ordem de entrada (repetições mantidas).
     
-    # Teste até √n
-    i = 5
-    while i * i <= n:
-        if n % i == 0 or n % (i + 2) == 0:
-            return False
-        i += 6
-    return True
+    Teste em lote: os candidatos distintos são agrupados por proximidade;
+    grupos densos são pré-crivados numa janela (bytearray, uma fatia por
+    primo-base) e candidatos grandes e esparsos por um único gcd com um
+    primorial. Só os sobreviventes passam pelo teste forte, primeiro todos
+    na base 2 e depois os que passaram no restante (Miller–Rabin
+    determinístico abaixo de 2^64, BPSW acima); sobreviventes menores que
+    o quadrado do limite do pré-crivo já são primos.
+    
+    Args:
+        candidates: Inteiros a testar (qualquer ordem e tamanho)
+        sieved: Os candidatos já não têm fator primo ≤ sieved (ex.:
+            sobreviventes de um crivo); com sieved > 0 o pré-crivo é pulado
+        base2_checked: Os candidatos já passaram no Miller–Rabin de base 2;
+            o teste forte começa pelas bases seguintes
+        
+    Returns:
+        Lista dos candidatos primos, na ordem em que apareceram
+        
+    Example:
+        >>> primes_among([15, 2**61 - 1, 7, 2**64 + 1, 7, 1, 2**89 - 1])
+        [2305843009213693951, 7, 7, 618970019642690137449562111]
+    """
+    values = list(candidates)
+    distinct = sorted({n for n in values if n >= 2})
+    prime = {}
+    survivors = []  # (n, limite do pré-crivo aplicado)
+    if sieved > 0:
+        survivors = [(n, sieved) for n in distinct]
+        distinct = []
+    
+    i = 0
+    while i < len(distinct):
+        lo = distinct[i]
+        if lo <= _PRESIEVE_BOUND:
+            prime[lo] = is_prime(lo)
+            i += 1
+            continue
+        j = i
+        while j < len(distinct) and distinct[j] - lo < _PRESIEVE_WINDOW:
+            j += 1
+        group = distinct[i:j]
+        i = j
+        
+        large = lo.bit_length() >= _PRESIEVE_LARGE_BITS
+        if len(group) >= (_PRESIEVE_DENSE if large else _PRESIEVE_DENSE_SMALL):
+            # Janela [lo, hi] crivada pelos primos-base (todos menores que lo)
+            size = group[-1] - lo + 1
+            bound = min(_PRESIEVE_BOUND, math.isqrt(group[-1]))
+            flags = bytearray(b'\x01') * size
+            for q in _base_primes(bound):
+                start = -lo % q
+                if start < size:
+                    flags[start::q] = bytes(len(range(start, size, q)))
+            survivors.extend((n, bound) for n in group if flags[n - lo])
+            continue
+        
+        for n in group:
+            if n.bit_length() < _PRESIEVE_LARGE_BITS:
+                prime[n] = is_prime(n)
+                continue
+            bound = _sparse_presieve_bound(n)
+            if math.gcd(n, _primorial(bound)) == 1:
+                survivors.append((n, bound))
+    
+    # Base 2 em todos antes do restante do teste: quase todo composto cai
+    # nesta primeira exponenciação
+    pending = []
+    for n, bound in survivors:
+        if n < (bound + 1) ** 2:
+            prime[n] = True
+        elif base2_checked or miller_rabin(n, (2,)):
+            pending.append(n)
+    for n in pending:
+        if n < 2**64:
+            prime[n] = miller_rabin(n, _MR_BASES_64[1:])
+        else:
+            prime[n] = strong_lucas_probable_prime(n)
+    
+    return [n for n in values if prime.get(n, False)]
+
+
+def iter_prime_pairs_with_gap(primes: Iterable[int], gap: int) -> Iterator[Tuple[int, int]]:
+    """
+    Versão preguiçosa de prime_pairs_with_gap: consome qualquer iterável
+    crescente de primos (por exemplo, segmented_sieve) em uma única passada.
+    
+    Args:
+        primes: Iterável crescente de primos
+        gap: Diferença desejada
+        
+    Yields:
+        Tuplas (p, p+gap) de primos consecutivos
+    """
+    prev = None
+    for p in primes:
+        if prev is not None and p - prev == gap:
+            yield (prev, p)
+        prev = p
 
 
-def prime_pairs_with_gap(primes: List[int], gap: int) -> List[Tuple[int, int]]:
+def prime_pairs_with_gap(primes: Iterable[int], gap: int) -> List[Tuple[int, int]]:
     """
     Encontra todos os pares de primos consecutivos com gap específico.
     
     Args:
-        primes: Lista de primos
+        primes: Lista (ou iterável crescente, ex.: PrimeSieve) de primos
         gap: Diferença desejada
         
     Returns:
         Lista de tuplas (p, p+gap) onde ambos são primos consecutivos
     """
-    prime_set = set(primes)
-    pairs = []
+    return list(iter_prime_pairs_with_gap(primes, gap))
+
+
+def iter_twin_primes(primes: Iterable[int]) -> Iterator[Tuple[int, int]]:
+    """
+    Versão preguiçosa de twin_primes.
     
-    for i in range(len(primes) - 1):
-        if primes[i+1] - primes[i] == gap:
-            pairs.append((primes[i], primes[i+1]))
+    Como p e p+2 primos são sempre consecutivos, basta comparar vizinhos,
+    sem construir um conjunto com todos os primos. Para um PrimeSieve os
+    gêmeos saem direto do bitmap (twin_lows).
     
-    return pairs
+    Args:
+        primes: Iterável crescente de primos
+        
+    Yields:
+        Tuplas (p, p+2) de primos gêmeos
+    """
+    if hasattr(primes, 'twin_lows'):
+        return ((p, p + 2) for p in primes.twin_lows())
+    return iter_prime_pairs_with_gap(primes, 2)
 
 
-def twin_primes(primes: List[int]) -> List[Tuple[int, int]]:
+def twin_primes(primes: Iterable[int]) -> List[Tuple[int, int]]:
     """
     Encontra todos os primos gêmeos (gap = 2) na lista.
     
     Args:
-        primes: Lista de primos
+        primes: Lista (ou iterável crescente, ex.: PrimeSieve) de primos
         
     Returns:
         Lista de tuplas (p, p+2) de primos gêmeos
     """
-    prime_set = set(primes)
-    return [(p, p+2) for p in primes if p + 2 in prime_set]
+    return list(iter_twin_primes(primes))
+
+
+# Maior primo-base dos crivos de gêmeos em janelas; acima de 2^40 (√ maior
+# que o limite) os sobreviventes são confirmados por is_prime
+_TWIN_SIEVE_BOUND = 1 << 20
+
+
+def _confirm_twins(lows: List[int], sieved: int) -> List[Tuple[int, int]]:
+    """
+    Pares (p, p+2) com os dois membros primos, para p em lows (sem fator
+    primo ≤ sieved em p nem em p + 2), testados em lote por primes_among.
+    Sobre a roda 6, 2 e 3 nunca dividem p nem p + 2, mesmo sem primos-base.
+    """
+    sieved = max(sieved, 3)
+    # Base 2 par a par antes do lote: p + 2 só é testado se p passou
+    lows = [p for p in lows if miller_rabin(p, (2,)) and miller_rabin(p + 2, (2,))]
+    confirmed = set(primes_among([n for p in lows for n in (p, p + 2)], sieved,
+                                 base2_checked=True))
+    return [(p, p + 2) for p in lows if p in confirmed and p + 2 in confirmed]
+
+
+def wheel_twin_primes(limit: int, start: int = 0,
+                      segment_size: int = DEFAULT_SEGMENT_SIZE,
+                      sieve_bound: int = _TWIN_SIEVE_BOUND) -> Iterator[Tuple[int, int]]:
+    """
+    Gera os primos gêmeos (p, p+2) com start ≤ p e p + 2 ≤ limit por um
+    crivo só de gêmeos sobre a roda 6.
+    
+    Todo gêmeo > (3, 5) é (6i + 5, 6i + 7): o crivo guarda um byte por i
+    (uma posição a cada 6 inteiros, contra uma por inteiro no crivo
+    genérico) e risca i quando p ou p + 2 tem fator primo ≤ √limit, com duas
+    fatias por primo-base (_twin_progression_flags). Os sobreviventes já
+    são os gêmeos, sem passar pela lista de primos.
+    
+    Só a janela [start, limit] é crivada, então o custo depende do tamanho
+    da janela e não da sua posição. Quando √limit passa de sieve_bound, os
+    primos-base param em sieve_bound e os sobreviventes (poucos) são
+    confirmados com is_prime em p e p + 2.
+    
+    Args:
+        limit: Maior valor de p + 2
+        start: Menor valor de p
+        segment_size: Quantidade de inteiros por segmento (≈ segment_size/6
+            posições da roda)
+        sieve_bound: Maior primo-base do crivo
+        
+    Yields:
+        Tuplas (p, p+2) em ordem crescente
+        
+    Example:
+        >>> list(wheel_twin_primes(100, start=10))
+        [(11, 13), (17, 19), (29, 31), (41, 43), (59, 61), (71, 73)]
+        >>> list(wheel_twin_primes(10**18 + 1000, start=10**18, sieve_bound=1000))
+        [(1000000000000000619, 1000000000000000621)]
+    """
+    if start <= 3 and limit >= 5:
+        yield (3, 5)
+    i_lo = max(0, -(-(start - 5) // 6))
+    i_end = (limit - 7) // 6 + 1
+    if i_lo >= i_end:
+        return
+    root = math.isqrt(limit)
+    exact = root <= sieve_bound
+    base_primes = _wheel_base_primes(min(root, sieve_bound))
+    # Segmentos de pelo menos 2·(maior primo-base) posições: o custo fixo
+    # por primo-base e segmento fica diluído também longe do zero
+    step = max(1, segment_size // 6, 2 * base_primes[-1] if base_primes else 0)
+    for i in range(i_lo, i_end, step):
+        i_hi = min(i + step, i_end)
+        flags = _twin_progression_flags(6, 5, i, i_hi, base_primes)
+        survivors = compress(range(6 * i + 5, 6 * i_hi + 5, 6), flags)
+        if exact:
+            yield from ((p, p + 2) for p in survivors)
+        else:
+            yield from _confirm_twins(list(survivors), min(root, sieve_bound))
+
+
+def twin_primes_in_range(a: int, b: int, segment_size: int = DEFAULT_SEGMENT_SIZE,
+                         sieve_bound: int = _TWIN_SIEVE_BOUND) -> List[Tuple[int, int]]:
+    """
+    Primos gêmeos (p, p+2) com a ≤ p e p + 2 ≤ b, crivando só a janela
+    [a, b] (wheel_twin_primes), sem crivar a partir de 2.
+    
+    Args:
+        a: Início do intervalo (inclusivo)
+        b: Fim do intervalo (inclusivo)
+        segment_size: Quantidade de inteiros por segmento
+        sieve_bound: Maior primo-base (acima de √b, confirmação por is_prime)
+        
+    Returns:
+        Lista de tuplas (p, p+2) em ordem crescente
+        
+    Example:
+        >>> twin_primes_in_range(10**15, 10**15 + 2780)
+        [(1000000000002371, 1000000000002373), (1000000000002767, 1000000000002769)]
+    """
+    return list(wheel_twin_primes(b, start=a, segment_size=segment_size,
+                                  sieve_bound=sieve_bound))
+
+
+def _count_wheel_twins(i_lo: int, i_hi: int, sieve_bound: int, exact: bool) -> int:
+    """
+    Quantidade de gêmeos (6i + 5, 6i + 7) com i ∈ [i_lo, i_hi): bytes 1 do
+    crivo da roda contados com bytearray.count, sem montar os pares
+    (confirmados por is_prime quando o crivo não é exato).
+    """
+    flags = _twin_progression_flags(6, 5, i_lo, i_hi, _wheel_base_primes(sieve_bound))
+    if exact:
+        return flags.count(1)
+    survivors = list(compress(range(6 * i_lo + 5, 6 * i_hi + 5, 6), flags))
+    return len(_confirm_twins(survivors, sieve_bound))
+
+
+# Segmento padrão da contagem: só um contador sai de cada segmento, então
+# segmentos maiores diluem o custo fixo por primo-base sem custo de memória
+_COUNT_SEGMENT_SIZE = 1 << 24
+
+
+def count_twins(limit: int, start: int = 0,
+                segment_size: int = _COUNT_SEGMENT_SIZE,
+                workers: Optional[int] = None,
+                sieve_bound: int = _TWIN_SIEVE_BOUND) -> int:
+    """
+    Conta os primos gêmeos (p, p+2) com start ≤ p e p + 2 ≤ limit.
+    
+    Mesmo crivo de wheel_twin_primes, mas cada segmento devolve só a
+    contagem dos seus bytes 1, então nada é materializado. Com start = 0
+    o resultado é π₂(limit).
+    
+    Args:
+        limit: Maior valor de p + 2
+        start: Menor valor de p
+        segment_size: Quantidade de inteiros por segmento
+        workers: Número de processos (None ou 1 = serial, 0 = todos os núcleos)
+        sieve_bound: Maior primo-base do crivo
+        
+    Returns:
+        Quantidade de pares
+        
+    Example:
+        >>> count_twins(10**5), count_twins(10**5, start=10**4)
+        (1224, 1019)
+    """
+    count = 1 if start <= 3 and limit >= 5 else 0
+    i_lo = max(0, -(-(start - 5) // 6))
+    i_end = (limit - 7) // 6 + 1
+    if i_lo >= i_end:
+        return count
+    root = math.isqrt(limit)
+    bound = min(root, sieve_bound)
+    base_primes = _base_primes(bound)
+    step = max(1, segment_size // 6, 2 * base_primes[-1] if base_primes else 0)
+    segments = [(i, min(i + step, i_end)) for i in range(i_lo, i_end, step)]
+    args = ([lo for lo, hi in segments], [hi for lo, hi in segments],
+            [bound] * len(segments), [root <= sieve_bound] * len(segments))
+    
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    if workers and workers > 1 and len(segments) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return count + sum(executor.map(_count_wheel_twins, *args))
+    return count + sum(map(_count_wheel_twins, *args))
+
+
+# Constante dos primos gêmeos C₂ = ∏_{p>2} p(p-2)/(p-1)²
+TWIN_PRIME_CONSTANT = 0.6601618158468696
+
+# γ de Euler–Mascheroni e li(2)
+_EULER_GAMMA = 0.5772156649015329
+_LI_2 = 1.0451637801174928
+
+
+def logarithmic_integral(x: float) -> float:
+    """
+    li(x) = ∫₀ˣ dt/ln t (valor principal) pela série de Ramanujan.
+    
+    Example:
+        >>> round(logarithmic_integral(10**6), 3)
+        78627.549
+    """
+    if x <= 1:
+        raise ValueError("logarithmic_integral requer x > 1")
+    L = math.log(x)
+    # Termo n: (-1)^(n-1)·Lⁿ/(n!·2^(n-1)) · Σ_{k ≤ (n-1)/2} 1/(2k+1)
+    total, term, inner = 0.0, 2.0, 0.0
+    n = 0
+    while True:
+        n += 1
+        term *= -L / (2 * n)
+        if n % 2 == 1:
+            inner += 1 / n
+        delta = -term * inner
+        total += delta
+        if n > L and abs(delta) <= 1e-17 * abs(total):
+            break
+    return _EULER_GAMMA + math.log(L) + math.sqrt(x) * total
+
+
+def hardy_littlewood_twins(x: float) -> float:
+    """
+    Previsão de Hardy–Littlewood para π₂(x): 2·C₂·∫₂ˣ dt/ln²t.
+    
+    A integral sai de li por partes: ∫₂ˣ dt/ln²t = li(x) − x/ln x − li(2) + 2/ln 2.
+    
+    Example:
+        >>> round(hardy_littlewood_twins(10**10))
+        27411417
+    """
+    if x <= 2:
+        return 0.0
+    integral = logarithmic_integral(x) - x / math.log(x) - _LI_2 + 2 / math.log(2)
+    return 2 * TWIN_PRIME_CONSTANT * integral
 
 
 # =============================================================================
 # VERIFICAÇÃO DO TEOREMA
 # =============================================================================
 
-def verify_theorem_single(p: int) -> Tuple[bool, Dict]:
+def theorem_holds(p: int) -> bool:
     """
-    Verifica o teorema xor_dist(p, p+2) = v₂(p+1) para um primo p.
+    Caminho rápido: xor_dist(p, p+2) = v₂(p+1)? Sem alocar nada por par.
+    
+    Example:
+        >>> theorem_holds(239)
+        True
+    """
+    return _popcount(p ^ (p + 2)) == _v2(p + 1)
+
+
+def theorem_details(p: int) -> Dict:
+    """
+    Registro de diagnóstico do teorema para p (binários, XOR, valores).
     
     Args:
         p: Primo ímpar
         
     Returns:
-        (sucesso, detalhes)
+        Dicionário com os detalhes
     """
-    xd = xor_dist(p, p + 2)
-    v2_val = v2(p + 1)
-    
-    details = {
+    return {
         'p': p,
         'p_binary': bin(p),
         'p_plus_2': p + 2,
         'p_plus_2_binary': bin(p + 2),
         'xor': p ^ (p + 2),
         'xor_binary': bin(p ^ (p + 2)),
-        'xor_dist': xd,
-        'v2_p_plus_1': v2_val,
+        'xor_dist': xor_dist(p, p + 2),
+        'v2_p_plus_1': v2(p + 1),
         'p_plus_1': p + 1,
         'trailing_ones_p': trailing_ones(p),
     }
+
+
+def verify_theorem_single(p: int) -> Tuple[bool, Dict]:
+    """
+    Verifica o teorema xor_dist(p, p+2) = v₂(p+1) para um primo p.
     
-    return xd == v2_val, details
+    Para verificar muitos pares use theorem_holds (ou verify_theorem_batch),
+    que não montam o registro de detalhes.
+    
+    Args:
+        p: Primo ímpar
+        
+    Returns:
+        (sucesso, detalhes)
+    """
+    details = theorem_details(p)
+    return details['xor_dist'] == details['v2_p_plus_1'], details
 
 
-def verify_theorem_batch(pairs: List[Tuple[int, int]], verbose: bool = False) -> Dict:
+def verify_theorem_batch(pairs: Iterable[Tuple[int, int]], verbose: bool = False) -> Dict:
     """
-    Verifica o teorema para uma lista de pares de primos.
+    Verifica o teorema para uma coleção de pares de primos.
+    
+    Aceita qualquer iterável (inclusive geradores), consumido em blocos.
+    Os sucessos são apenas contados; os detalhes só são montados para as
+    falhas. Com NumPy, cada bloco é comparado por xor_dist_batch(p, p+2)
+    e v2_batch(p+1).
     
     Args:
-        pairs: Lista de pares (p, p+2)
+        pairs: Pares (p, p+2)
         verbose: Se True, mostra progresso
         
     Returns:
         Dicionário com estatísticas
     """
-    total = len(pairs)
+    size = len(pairs) if hasattr(pairs, '__len__') else None
+    total = 0
     matches = 0
     failures = []
     
-    for i, (p, q) in enumerate(pairs):
-        success, details = verify_theorem_single(p)
-        if success:
-            matches += 1
+    it = iter(pairs)
+    while True:
+        lows = [p for p, q in islice(it, _BATCH_CHUNK)]
+        if not lows:
+            break
+        total += len(lows)
+        
+        arr = _as_uint64(lows) if max(lows) < 2**64 - 2 else None
+        if arr is not None:
+            ok = xor_dist_batch(arr, arr + np.uint64(2)) == v2_batch(arr + np.uint64(1))
+            matches += int(np.count_nonzero(ok))
+            failures.extend(theorem_details(int(p)) for p in arr[~ok])
         else:
-            failures.append(details)
+            for p in lows:
+                if theorem_holds(p):
+                    matches += 1
+                else:
+                    failures.append(theorem_details(p))
         
-        if verbose and (i + 1) % 10000 == 0:
-            print(f"Verificado: {i+1}/{total} ({100*(i+1)/total:.1f}%)")
+        if verbose:
+            if size:
+                print(f"Verificado: {total}/{size} ({100*total/size:.1f}%)")
+            else:
+                print(f"Verificado: {total}")
     
     return {
         'total': total,
@@ -324,113 +1406,803 @@ def verify_theorem_batch(pairs: List[Tuple[int, int]], verbose: bool = False) ->
 # ANÁLISE DE DISTRIBUIÇÃO
 # =============================================================================
 
-def xor_dist_distribution(pairs: List[Tuple[int, int]]) -> Dict[int, int]:
+class DistributionAccumulator:
+    """
+    Estatísticas de xor_dist acumuladas em fluxo, com memória O(histograma).
+    
+    Mantém contagem, média e variância (Welford; blocos combinados pela
+    fórmula de Chan), mínimo, máximo e histograma; a entropia sai do
+    histograma. Acumuladores parciais (por segmento ou por processo) se
+    combinam com merge(): histograma, contagem e extremos são exatos.
+    
+    Example:
+        >>> acc = DistributionAccumulator().update([1, 2, 1, 3])
+        >>> other = DistributionAccumulator()
+        >>> other.add(4)
+        >>> stats = acc.merge(other).result()
+        >>> stats['mean'], stats['max'], stats['distribution']
+        (2.2, 4, {1: 2, 2: 1, 3: 1, 4: 1})
+    """
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.min = None
+        self.max = None
+        self.histogram: Dict[int, int] = {}
+        self._m2 = 0.0
+    
+    def add(self, d: int):
+        """Acrescenta um valor (atualização de Welford)."""
+        self.count += 1
+        delta = d - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (d - self.mean)
+        if self.min is None or d < self.min:
+            self.min = d
+        if self.max is None or d > self.max:
+            self.max = d
+        self.histogram[d] = self.histogram.get(d, 0) + 1
+    
+    def _combine(self, n: int, mean: float, m2: float, lo: int, hi: int):
+        """Combina os momentos de outro bloco (fórmula de Chan)."""
+        if n == 0:
+            return
+        total = self.count + n
+        delta = mean - self.mean
+        self._m2 += m2 + delta * delta * self.count * n / total
+        self.mean += delta * n / total
+        self.count = total
+        self.min = lo if self.min is None else min(self.min, lo)
+        self.max = hi if self.max is None else max(self.max, hi)
+    
+    def update_histogram(self, histogram: Dict[int, int]) -> 'DistributionAccumulator':
+        """Acrescenta um bloco já resumido em histograma {valor: contagem}."""
+        n = sum(histogram.values())
+        if n == 0:
+            return self
+        mean = sum(k * c for k, c in histogram.items()) / n
+        m2 = sum(c * (k - mean) ** 2 for k, c in histogram.items())
+        for k, c in histogram.items():
+            self.histogram[k] = self.histogram.get(k, 0) + c
+        self._combine(n, mean, m2, min(k for k, c in histogram.items() if c),
+                      max(k for k, c in histogram.items() if c))
+        return self
+    
+    def update(self, distances: Iterable[int]) -> 'DistributionAccumulator':
+        """
+        Acrescenta vários valores (iterável ou array NumPy) em uma passada.
+        """
+        if np is not None and isinstance(distances, np.ndarray):
+            counts = np.bincount(distances) if len(distances) else []
+            return self.update_histogram({k: int(c) for k, c in enumerate(counts) if c})
+        histogram = {}
+        for d in distances:
+            histogram[d] = histogram.get(d, 0) + 1
+        return self.update_histogram(histogram)
+    
+    def update_pairs(self, pairs: Iterable[Tuple[int, int]]) -> 'DistributionAccumulator':
+        """
+        Acrescenta xor_dist(p, q) de cada par, em blocos (kernels NumPy
+        quando disponíveis).
+        """
+        it = iter(pairs)
+        while True:
+            chunk = list(islice(it, _BATCH_CHUNK))
+            if not chunk:
+                return self
+            self.update(xor_dist_batch([p for p, q in chunk], [q for p, q in chunk]))
+    
+    def merge(self, other: 'DistributionAccumulator') -> 'DistributionAccumulator':
+        """Incorpora outro acumulador (resultado idêntico ao fluxo concatenado)."""
+        for k, c in other.histogram.items():
+            self.histogram[k] = self.histogram.get(k, 0) + c
+        self._combine(other.count, other.mean, other._m2, other.min, other.max)
+        return self
+    
+    @property
+    def variance(self) -> float:
+        return self._m2 / self.count if self.count else 0.0
+    
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+    
+    @property
+    def entropy(self) -> float:
+        """Entropia de Shannon (bits) do histograma."""
+        entropy = 0
+        for count in self.histogram.values():
+            p = count / self.count
+            if p > 0:
+                entropy -= p * math.log2(p)
+        return entropy
+    
+    def result(self) -> Dict:
+        """Estatísticas no formato de distribution_stats ({} se vazio)."""
+        if self.count == 0:
+            return {}
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'std': self.std,
+            'variance': self.variance,
+            'min': self.min,
+            'max': self.max,
+            'entropy': self.entropy,
+            'distribution': dict(sorted(self.histogram.items()))
+        }
+
+
+class GapIndex:
+    """
+    Índice compacto dos gaps entre primos consecutivos.
+    
+    Guarda o primeiro primo e um array uint16 com as diferenças (2 bytes
+    por primo), construído uma única vez. Consultas por gap, histograma de
+    gaps e estatísticas de xor_dist por gap percorrem o array em blocos,
+    vetorizados com NumPy quando disponível.
+    
+    Example:
+        >>> index = GapIndex(PrimeSieve(100))
+        >>> index.pairs_with_gap(6)
+        [(23, 29), (31, 37), (47, 53), (53, 59), (61, 67), (73, 79), (83, 89)]
+        >>> index.pairs_with_gap(4, 10, 50), index.gap_histogram()[2]
+        ([(13, 17), (19, 23), (37, 41), (43, 47)], 8)
+    """
+    
+    def __init__(self, primes: Iterable[int]):
+        """
+        Args:
+            primes: Iterável crescente de primos (lista, PrimeSieve, ...)
+        """
+        it = iter(primes)
+        self.first = next(it, None)
+        self.gaps = array('H')
+        self.last = self.first
+        if self.first is None:
+            return
+        prev = self.first
+        append = self.gaps.append
+        for p in it:
+            append(p - prev)
+            prev = p
+        self.last = prev
+    
+    def __len__(self) -> int:
+        """Número de primos indexados."""
+        return 0 if self.first is None else len(self.gaps) + 1
+    
+    def _vectorized(self) -> bool:
+        return np is not None and self.last is not None and self.last < 2**63
+    
+    def _blocks(self):
+        """
+        Gera blocos (lows, gaps): lows[k] é o primo anterior ao gap gaps[k].
+        Arrays NumPy se disponível, senão listas.
+        """
+        if self.first is None:
+            return
+        base = self.first
+        if self._vectorized():
+            all_gaps = np.frombuffer(self.gaps, dtype=np.uint16)
+            for start in range(0, len(all_gaps), _BATCH_CHUNK):
+                gaps = all_gaps[start:start + _BATCH_CHUNK]
+                ends = np.cumsum(gaps, dtype=np.uint64) + np.uint64(base)
+                yield ends - gaps, gaps
+                base = int(ends[-1])
+        else:
+            for start in range(0, len(self.gaps), _BATCH_CHUNK):
+                gaps = self.gaps[start:start + _BATCH_CHUNK]
+                lows = []
+                for g in gaps:
+                    lows.append(base)
+                    base += g
+                yield lows, gaps
+    
+    def primes(self) -> Iterator[int]:
+        """Gera os primos indexados, reconstruídos a partir dos gaps."""
+        if self.first is None:
+            return
+        for lows, gaps in self._blocks():
+            yield from (int(p) for p in lows)
+        yield self.last
+    
+    def pairs_with_gap(self, gap: int, start: int = 0,
+                       stop: Optional[int] = None) -> List[Tuple[int, int]]:
+        """
+        Pares (p, p+gap) de primos consecutivos com start ≤ p < stop.
+        """
+        pairs = []
+        for lows, gaps in self._blocks():
+            if isinstance(lows, list):
+                pairs.extend((p, p + g) for p, g in zip(lows, gaps)
+                             if g == gap and p >= start and (stop is None or p < stop))
+                continue
+            mask = (gaps == gap) & (lows >= np.uint64(max(start, 0)))
+            if stop is not None:
+                mask &= lows < np.uint64(max(stop, 0))
+            pairs.extend((int(p), int(p) + gap) for p in lows[mask])
+        return pairs
+    
+    def gap_histogram(self) -> Dict[int, int]:
+        """Histograma {gap: contagem} dos gaps entre primos consecutivos."""
+        histogram = {}
+        for lows, gaps in self._blocks():
+            if isinstance(gaps, array):
+                for g in gaps:
+                    histogram[g] = histogram.get(g, 0) + 1
+                continue
+            for g, c in enumerate(np.bincount(gaps)):
+                if c:
+                    histogram[g] = histogram.get(g, 0) + int(c)
+        return dict(sorted(histogram.items()))
+    
+    def xor_dist_by_gap(self, gaps: Iterable[int]) -> Dict[int, DistributionAccumulator]:
+        """
+        Estatísticas de xor_dist(p, p+g) para cada gap g, em uma única
+        passada sobre o índice.
+        
+        Returns:
+            {gap: DistributionAccumulator}
+        """
+        wanted = sorted(set(gaps))
+        accumulators = {g: DistributionAccumulator() for g in wanted}
+        for lows, block_gaps in self._blocks():
+            if isinstance(lows, list):
+                histograms = {g: {} for g in wanted}
+                for p, g in zip(lows, block_gaps):
+                    hist = histograms.get(g)
+                    if hist is not None:
+                        d = xor_dist(p, p + g)
+                        hist[d] = hist.get(d, 0) + 1
+            else:
+                # Chave combinada gap·65 + xor_dist → um único bincount 2D
+                mask = np.isin(block_gaps, wanted)
+                sel_lows = lows[mask]
+                sel_gaps = block_gaps[mask].astype(np.uint64)
+                distances = xor_dist_batch(sel_lows, sel_lows + sel_gaps)
+                counts = np.bincount(sel_gaps.astype(np.int64) * 65 + distances)
+                histograms = {g: {d: int(c) for d, c in enumerate(counts[g * 65:(g + 1) * 65]) if c}
+                              for g in wanted}
+            for g, hist in histograms.items():
+                accumulators[g].update_histogram(hist)
+        return accumulators
+    
+    def __repr__(self):
+        return f"GapIndex(primes={len(self):,}, nbytes={self.gaps.itemsize * len(self.gaps):,})"
+
+
+def xor_dist_distribution(pairs: Iterable[Tuple[int, int]]) -> Dict[int, int]:
     """
     Calcula a distribuição de xor_dist para uma lista de pares.
     
     Args:
-        pairs: Lista de pares (p, q)
+        pairs: Lista (ou iterável) de pares (p, q)
         
     Returns:
         Dicionário {xor_dist: contagem}
     """
-    dist = {}
-    for p, q in pairs:
-        d = xor_dist(p, q)
-        dist[d] = dist.get(d, 0) + 1
-    return dict(sorted(dist.items()))
+    acc = DistributionAccumulator().update_pairs(pairs)
+    return dict(sorted(acc.histogram.items()))
 
 
-def distribution_stats(pairs: List[Tuple[int, int]]) -> Dict:
+def distribution_stats(pairs: Iterable[Tuple[int, int]]) -> Dict:
     """
     Calcula estatísticas da distribuição de xor_dist.
     
+    Uma única passada sobre os pares (DistributionAccumulator); a memória
+    não cresce com o número de pares.
+    
     Args:
-        pairs: Lista de pares
+        pairs: Lista (ou iterável) de pares
         
     Returns:
         Estatísticas (média, desvio, entropia, etc.)
     """
-    if not pairs:
-        return {}
+    return DistributionAccumulator().update_pairs(pairs).result()
+
+
+def distance_stats(distances: Iterable[int]) -> Dict:
+    """
+    Estatísticas de valores de xor_dist já calculados.
     
-    distances = [xor_dist(p, q) for p, q in pairs]
-    n = len(distances)
+    Args:
+        distances: Valores de xor_dist (um por par; iterável ou array NumPy)
+        
+    Returns:
+        Estatísticas (média, desvio, entropia, etc.)
+    """
+    return DistributionAccumulator().update(distances).result()
+
+
+# =============================================================================
+# TESTE QUI-QUADRADO
+# =============================================================================
+
+_GAMMA_EPS = 1e-15
+_GAMMA_MAX_ITER = 1000
+
+
+def regularized_gamma_q(a: float, x: float) -> float:
+    """
+    Função gama incompleta superior regularizada Q(a, x) = Γ(a, x) / Γ(a).
     
-    # Média
-    mean = sum(distances) / n
+    Série de P(a, x) para x < a + 1 e fração contínua (Lentz) de Q(a, x)
+    caso contrário, como em Numerical Recipes (gammp/gammq).
     
-    # Variância e desvio padrão
-    variance = sum((d - mean)**2 for d in distances) / n
-    std = math.sqrt(variance)
+    Args:
+        a: Parâmetro de forma (a > 0)
+        x: Ponto de avaliação (x ≥ 0)
+        
+    Returns:
+        Q(a, x) em [0, 1]
+        
+    Example:
+        >>> round(regularized_gamma_q(1, 2), 12) == round(math.exp(-2), 12)
+        True
+    """
+    if a <= 0 or x < 0:
+        raise ValueError("regularized_gamma_q requer a > 0 e x ≥ 0")
+    if x == 0:
+        return 1.0
+    log_prefactor = a * math.log(x) - x - math.lgamma(a)
     
-    # Distribuição
-    dist = {}
-    for d in distances:
-        dist[d] = dist.get(d, 0) + 1
+    if x < a + 1:
+        # Série: P(a, x) = e^{-x} x^a / Γ(a+1) · Σ x^n / ((a+1)···(a+n))
+        term = total = 1.0 / a
+        ap = a
+        for _ in range(_GAMMA_MAX_ITER):
+            ap += 1
+            term *= x / ap
+            total += term
+            if abs(term) < abs(total) * _GAMMA_EPS:
+                break
+        return max(0.0, 1.0 - total * math.exp(log_prefactor))
     
-    # Entropia de Shannon
-    entropy = 0
-    for count in dist.values():
-        p = count / n
-        if p > 0:
-            entropy -= p * math.log2(p)
+    # Fração contínua de Q(a, x) pelo método de Lentz modificado
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, _GAMMA_MAX_ITER + 1):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < _GAMMA_EPS:
+            break
+    return math.exp(log_prefactor) * h
+
+
+def chi2_sf(x: float, df: int) -> float:
+    """
+    Função de sobrevivência da qui-quadrado: P(χ²_df ≥ x) (o p-valor).
     
-    return {
-        'count': n,
-        'mean': mean,
-        'std': std,
-        'variance': variance,
-        'min': min(distances),
-        'max': max(distances),
-        'entropy': entropy,
-        'distribution': dict(sorted(dist.items()))
-    }
+    Example:
+        >>> round(chi2_sf(6.634896601021214, 1), 6)
+        0.01
+    """
+    if df <= 0:
+        return float('nan')
+    if x <= 0:
+        return 1.0
+    return regularized_gamma_q(df / 2, x / 2)
+
+
+def chi2_critical_value(alpha: float, df: int) -> float:
+    """
+    Valor crítico c com P(χ²_df ≥ c) = alpha, por bisseção em chi2_sf.
+    
+    Example:
+        >>> round(chi2_critical_value(0.01, 10), 3)
+        23.209
+    """
+    if df <= 0:
+        return float('nan')
+    lo, hi = 0.0, float(df) + 10
+    while chi2_sf(hi, df) > alpha:
+        lo, hi = hi, 2 * hi
+    for _ in range(200):
+        mid = (lo + hi) / 2
+        if chi2_sf(mid, df) > alpha:
+            lo = mid
+        else:
+            hi = mid
+        if hi - lo <= 1e-12 * hi:
+            break
+    return (lo + hi) / 2
 
 
 # =============================================================================
 # CASOS ESPECIAIS
 # =============================================================================
 
-def mersenne_primes(max_exp: int = 20) -> List[Tuple[int, int, int]]:
+def lucas_lehmer(p: int) -> bool:
+    """
+    Teste de Lucas–Lehmer: 2^p - 1 é primo? (p primo)
+    
+    A redução módulo M = 2^p - 1 é feita por deslocamento e soma,
+    já que 2^p ≡ 1 (mod M): x ≡ (x & M) + (x >> p).
+    
+    Args:
+        p: Expoente primo
+        
+    Returns:
+        True se 2^p - 1 é primo
+        
+    Example:
+        >>> [p for p in (2, 3, 5, 7, 11, 13) if lucas_lehmer(p)]
+        [2, 3, 5, 7, 13]
+    """
+    if p == 2:
+        return True
+    m = (1 << p) - 1
+    s = 4
+    for _ in range(p - 2):
+        s = s * s - 2
+        while s > m:
+            s = (s & m) + (s >> p)
+        if s == m:
+            s = 0
+    return s == 0
+
+
+# Limite dos divisores testados antes do Lucas–Lehmer
+_MERSENNE_TRIAL_BOUND = 1 << 24
+
+
+def _mersenne_exponent_test(p: int) -> bool:
+    """
+    2^p - 1 é primo? Descarta primeiro divisores pequenos q = 2kp + 1
+    (q ≡ ±1 mod 8) e só então roda o Lucas–Lehmer.
+    """
+    m = (1 << p) - 1
+    # Até ~4p candidatos: para p pequeno o Lucas–Lehmer já é mais barato
+    bound = min(_MERSENNE_TRIAL_BOUND, m, 8 * p * p)
+    for q in range(2 * p + 1, bound, 2 * p):
+        if q % 8 in (1, 7) and pow(2, p, q) == 1:
+            return False
+    return lucas_lehmer(p)
+
+
+def mersenne_primes(max_exp: int = 20, workers: Optional[int] = None,
+                    time_budget: Optional[float] = None) -> List[Tuple[int, int, int]]:
     """
-    Gera primos de Mersenne conhecidos até expoente max_exp.
+    Descobre os primos de Mersenne 2^n - 1 com expoente n ≤ max_exp.
     
+    Cada expoente primo passa por divisão por tentativa (q = 2kp + 1) e por
+    Lucas–Lehmer, em um pool de processos quando workers > 1. Com time_budget (segundos), a busca para no
+    primeiro expoente cujo resultado não saiu a tempo; o resultado cobre
+    então todos os expoentes até o último testado.
+    
+    Args:
+        max_exp: Maior expoente testado
+        workers: Número de processos (None ou 1 = serial)
+        time_budget: Tempo máximo em segundos (None = sem limite)
+        
     Returns:
         Lista de (expoente, primo, v₂(primo+1))
     """
-    # Expoentes conhecidos para primos de Mersenne
-    known_exponents = [2, 3, 5, 7, 13, 17, 19, 31, 61, 89, 107, 127, 521, 607]
+    exponents = list(segmented_sieve(max_exp))
+    deadline = None if time_budget is None else time.time() + time_budget
+    
+    executor = None
+    if workers and workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        futures = [executor.submit(_mersenne_exponent_test, n) for n in exponents]
     
     result = []
-    for n in known_exponents:
-        if n <= max_exp:
-            p = 2**n - 1
-            result.append((n, p, v2(p + 1)))
+    try:
+        for i, n in enumerate(exponents):
+            remaining = None if deadline is None else deadline - time.time()
+            if remaining is not None and remaining <= 0:
+                break
+            if executor is not None:
+                try:
+                    is_mersenne_prime = futures[i].result(timeout=remaining)
+                except FuturesTimeoutError:
+                    break
+            else:
+                is_mersenne_prime = _mersenne_exponent_test(n)
+            
+            if is_mersenne_prime:
+                p = (1 << n) - 1
+                result.append((n, p, v2(p + 1)))
+    finally:
+        if executor is not None:
+            for f in futures:
+                f.cancel()
+            executor.shutdown(wait=True)
     
     return result
 
 
-def high_xor_dist_twins(primes: List[int], threshold: int = 4) -> List[Tuple[int, int, int]]:
+def _twin_progression_flags(A: int, B: int, i_lo: int, i_hi: int,
+                            base_primes: List[int]) -> bytearray:
+    """
+    Crivo dos candidatos p = A·i + B, i ∈ [i_lo, i_hi), para o par (p, p+2).
+    
+    flags[t] = 1 sse nem p nem p + 2 (com i = i_lo + t) têm fator entre os
+    primos-base (um primo-base igual ao próprio número não conta). Os
+    primos-base devem ser coprimos com A.
+    
+    Returns:
+        bytearray com um byte por candidato
+    """
+    size = i_hi - i_lo
+    flags = bytearray(b'\x01') * size
+    top = A * (i_hi - 1) + B + 2
+    for q in base_primes:
+        if q * q > top:
+            break
+        inv = pow(A, -1, q)
+        for offset in (B, B + 2):
+            # q | A·i + offset  ⇔  i ≡ -offset·A⁻¹ (mod q)
+            t = (-offset * inv - i_lo) % q
+            if A * (i_lo + t) + offset == q:
+                t += q
+            if t < size:
+                flags[t::q] = bytes(len(range(t, size, q)))
+    return flags
+
+
+def high_v2_twins(limit: int, min_v2: int = 5, top_k: Optional[int] = None,
+                  segment_size: int = DEFAULT_SEGMENT_SIZE) -> List[Tuple[int, int, int]]:
+    """
+    Busca direcionada de primos gêmeos com v₂(p+1) alto.
+    
+    Pelo teorema, v₂(p+1) = k exatamente sse p ≡ 2^k - 1 (mod 2^(k+1));
+    com a roda mod 3 (p ≡ 2 mod 3 para todo gêmeo > 3) os candidatos são
+    p = 3·2^(k+1)·i + 3·2^k - 1. Só essa progressão é crivada, para p e
+    p + 2 ao mesmo tempo, de k máximo até min_v2, parando assim que top_k
+    pares foram encontrados.
+    
+    Args:
+        limit: Maior valor de p + 2
+        min_v2: Menor v₂(p+1) procurado
+        top_k: Quantidade de pares desejada (None = todos com v₂ ≥ min_v2)
+        segment_size: Candidatos crivados por vez
+        
+    Returns:
+        Lista de (p, p+2, v₂(p+1)) em ordem decrescente de v₂ e crescente
+        de p (a mesma ordem de find_extreme_cases)
+        
+    Example:
+        >>> high_v2_twins(10**6, top_k=3)
+        [(786431, 786433, 18), (737279, 737281, 14), (675839, 675841, 12)]
+    """
+    result = []
+    if limit < 5 or top_k == 0:
+        return result
+    
+    base_primes = _base_primes(math.isqrt(limit))[2:]  # sem 2 e 3
+    k = max(min_v2, 2)
+    while 3 * (2 << k) + 1 <= limit:
+        k += 1
+    
+    for k in range(k, max(min_v2, 1) - 1, -1):
+        A, B = 3 << (k + 1), (3 << k) - 1
+        if k == 2:
+            result.append((3, 5, 2))  # único gêmeo fora da roda mod 3
+        count = (limit - 2 - B) // A + 1 if B + 2 <= limit else 0
+        for i_lo in range(0, count, segment_size):
+            i_hi = min(i_lo + segment_size, count)
+            flags = _twin_progression_flags(A, B, i_lo, i_hi, base_primes)
+            result.extend((p, p + 2, k)
+                          for p in compress(range(A * i_lo + B, A * i_hi + B, A), flags))
+        if top_k is not None and len(result) >= top_k:
+            return result[:top_k]
+    
+    return result
+
+
+@lru_cache(maxsize=4)
+def _wheel_base_primes(bound: int) -> Tuple[int, ...]:
+    """Primos-base de 5 até bound (coprimos com a roda 6)."""
+    return tuple(_base_primes(bound)[2:])
+
+
+def random_twin_prime(bits: int, rng: Optional[random.Random] = None,
+                      sieve_bound: Optional[int] = None,
+                      window: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Sorteia um par de primos gêmeos (p, p+2) com p de exatamente bits bits.
+    
+    Todo gêmeo > 3 é (6k - 1, 6k + 1): a partir de um k aleatório, janelas
+    de k consecutivos são crivadas para p e p + 2 ao mesmo tempo pelos
+    primos até sieve_bound (_twin_progression_flags com p = 6i + 5), e só
+    os sobreviventes passam pelo BPSW (MR base 2 + Lucas forte) em p e em
+    p + 2. O par devolvido é o primeiro gêmeo a partir do k sorteado
+    (logo pares após lacunas longas são um pouco favorecidos).
+    
+    O custo cresce com ~ (ln p / ln sieve_bound)² testes modulares por
+    par: segundos para 1024 bits, minutos para 2048 e dezenas de minutos
+    para 4096 em Python puro.
+    
+    Args:
+        bits: Tamanho de p em bits (≥ 3)
+        rng: Gerador (random.Random) para reprodutibilidade
+        sieve_bound: Maior primo do pré-crivo (padrão cresce com bits)
+        window: Candidatos k por janela (padrão cresce com bits)
+        
+    Returns:
+        (p, p+2), ambos primos prováveis BPSW
+        
+    Example:
+        >>> p, q = random_twin_prime(64, random.Random(1))
+        >>> p.bit_length(), is_prime(p) and is_prime(q), verify_theorem_single(p)[0]
+        (64, True, True)
+    """
+    if bits < 3:
+        raise ValueError("random_twin_prime requer bits ≥ 3")
+    rng = rng or random.Random()
+    if sieve_bound is None:
+        sieve_bound = min(1 << 22, max(1 << 12, 4 * bits * bits))
+    if window is None:
+        window = 64 * bits
+    base_primes = _wheel_base_primes(sieve_bound)
+    
+    # p = 6i + 5 com 2^(bits-1) ≤ p < 2^bits
+    i_min = max(0, -(-((1 << (bits - 1)) - 5) // 6))
+    i_max = ((1 << bits) - 1 - 5) // 6
+    
+    i_lo = rng.randint(i_min, i_max)
+    while True:
+        i_hi = min(i_lo + window, i_max + 1)
+        flags = _twin_progression_flags(6, 5, i_lo, i_hi, base_primes)
+        for p in compress(range(6 * i_lo + 5, 6 * i_hi + 5, 6), flags):
+            # BPSW nos dois membros, com o Lucas forte só após MR base 2 em ambos
+            if (miller_rabin(p, (2,)) and miller_rabin(p + 2, (2,))
+                    and strong_lucas_probable_prime(p)
+                    and strong_lucas_probable_prime(p + 2)):
+                return (p, p + 2)
+        # Fim do intervalo de bits bits: recomeça de outro ponto aleatório
+        i_lo = i_hi if i_hi <= i_max else rng.randint(i_min, i_max)
+
+
+class ExtremesCollector:
+    """
+    Casos extremos dos primos gêmeos, coletados em uma passada.
+    
+    Mantém o par de maior xor_dist, a contagem por v₂(p+1) e, num heap de
+    tamanho fixo, os top_k pares com v₂(p+1) ≥ min_v2 (maior v₂ primeiro,
+    empates pelo menor p). Memória O(top_k); coletores parciais de
+    segmentos ou processos se combinam com merge().
+    
+    Example:
+        >>> c = ExtremesCollector(top_k=2, min_v2=3).update([(5, 7), (71, 73), (239, 241)])
+        >>> c.top(), c.v2_counts, c.max_xor_dist_pair
+        ([(239, 241, 4), (71, 73, 3)], {1: 1, 3: 1, 4: 1}, (239, 241, 4))
+    """
+    
+    def __init__(self, top_k: int = 20, min_v2: int = 5):
+        self.top_k = top_k
+        self.min_v2 = min_v2
+        self.total = 0
+        self.v2_counts: Dict[int, int] = {}
+        self.max_xor_dist_pair: Optional[Tuple[int, int, int]] = None
+        # Heap mínimo de (v2, -p, q): a raiz é o pior par mantido
+        self._heap: List[Tuple[int, int, int]] = []
+    
+    def add(self, p: int, q: int, d: int, v2_val: int):
+        """Registra um par com xor_dist d e v₂(p+1) = v2_val."""
+        self.total += 1
+        self.v2_counts[v2_val] = self.v2_counts.get(v2_val, 0) + 1
+        best = self.max_xor_dist_pair
+        if best is None or d > best[2] or (d == best[2] and p < best[0]):
+            self.max_xor_dist_pair = (p, q, d)
+        if v2_val >= self.min_v2 and self.top_k > 0:
+            self._offer((v2_val, -p, q))
+    
+    def _offer(self, item: Tuple[int, int, int]):
+        if len(self._heap) < self.top_k:
+            heapq.heappush(self._heap, item)
+        elif item > self._heap[0]:
+            heapq.heapreplace(self._heap, item)
+    
+    def update(self, twins: Iterable[Tuple[int, int]]) -> 'ExtremesCollector':
+        """Registra cada par (p, p+2) de um iterável."""
+        for p, q in twins:
+            self.add(p, q, xor_dist(p, q), v2(p + 1))
+        return self
+    
+    def merge(self, other: 'ExtremesCollector') -> 'ExtremesCollector':
+        """Incorpora outro coletor (mesmo resultado do fluxo concatenado)."""
+        self.total += other.total
+        for k, c in other.v2_counts.items():
+            self.v2_counts[k] = self.v2_counts.get(k, 0) + c
+        best, cand = self.max_xor_dist_pair, other.max_xor_dist_pair
+        if cand is not None and (best is None or (-cand[2], cand[0]) < (-best[2], best[0])):
+            self.max_xor_dist_pair = cand
+        for item in other._heap:
+            self._offer(item)
+        return self
+    
+    def state(self) -> Dict:
+        """Estado serializável em JSON (para checkpoints); ver from_state."""
+        return {
+            'top_k': self.top_k,
+            'min_v2': self.min_v2,
+            'total': self.total,
+            'v2_counts': self.v2_counts,
+            'max_xor_dist_pair': self.max_xor_dist_pair,
+            'heap': self._heap,
+        }
+    
+    @classmethod
+    def from_state(cls, state: Dict) -> 'ExtremesCollector':
+        """Reconstrói um coletor a partir de state() (inclusive após JSON)."""
+        collector = cls(state['top_k'], state['min_v2'])
+        collector.total = state['total']
+        collector.v2_counts = {int(k): c for k, c in state['v2_counts'].items()}
+        if state['max_xor_dist_pair'] is not None:
+            collector.max_xor_dist_pair = tuple(state['max_xor_dist_pair'])
+        collector._heap = [tuple(item) for item in state['heap']]
+        heapq.heapify(collector._heap)
+        return collector
+    
+    def top(self) -> List[Tuple[int, int, int]]:
+        """Os top_k pares (p, p+2, v₂(p+1)), do maior v₂ para o menor."""
+        return [(-neg_p, q, k) for k, neg_p, q in sorted(self._heap, reverse=True)]
+    
+    def result(self) -> Dict:
+        """Casos extremos no formato de find_extreme_cases."""
+        return {
+            'max_xor_dist_pair': self.max_xor_dist_pair,
+            'v2_distribution': dict(sorted(self.v2_counts.items())),
+            'high_v2_twins': self.top(),
+            'total_twins': self.total
+        }
+
+
+def high_xor_dist_twins(primes: Iterable[int], threshold: int = 4,
+                        top_k: Optional[int] = None) -> List[Tuple[int, int, int]]:
     """
     Encontra primos gêmeos com xor_dist alto.
     
+    A ordenação é por baldes de xor_dist (linear, sem sort completo); com
+    top_k, só os top_k melhores são mantidos num heap.
+    
     Args:
-        primes: Lista de primos
+        primes: Lista de primos (ou iterável crescente, ex.: PrimeSieve)
         threshold: Mínimo xor_dist
+        top_k: Quantidade máxima de pares (None = todos)
         
     Returns:
-        Lista de (p, p+2, xor_dist)
+        Lista de (p, p+2, xor_dist), do maior xor_dist para o menor
     """
-    twins = twin_primes(primes)
-    result = []
+    candidates = ((p, q, d) for p, q in iter_twin_primes(primes)
+                  for d in (xor_dist(p, q),) if d >= threshold)
+    return rank_by_xor_dist(candidates, top_k)
+
+
+def rank_by_xor_dist(candidates: Iterable[Tuple[int, int, int]],
+                     top_k: Optional[int] = None) -> List[Tuple[int, int, int]]:
+    """
+    Ordena triplas (p, q, xor_dist) do maior xor_dist para o menor
+    (crescente em p dentro do mesmo xor_dist, para entrada crescente).
     
-    for p, q in twins:
-        d = xor_dist(p, q)
-        if d >= threshold:
-            result.append((p, q, d))
+    Sem top_k a ordenação é por baldes de xor_dist (linear); com top_k, um
+    heap de top_k itens (O(n log top_k)).
+    
+    Example:
+        >>> rank_by_xor_dist([(11, 13, 2), (239, 241, 4), (71, 73, 3)], top_k=2)
+        [(239, 241, 4), (71, 73, 3)]
+    """
+    if top_k is not None:
+        return heapq.nsmallest(top_k, candidates, key=lambda x: (-x[2], x[0]))
     
-    return sorted(result, key=lambda x: -x[2])
+    buckets: Dict[int, List[Tuple[int, int, int]]] = {}
+    for item in candidates:
+        buckets.setdefault(item[2], []).append(item)
+    return [item for d in sorted(buckets, reverse=True) for item in buckets[d]]
 
 
 # =============================================================================
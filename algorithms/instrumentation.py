@@ -0,0 +1,166 @@
+"""
+XOR_dist Instrumentation
+========================
+
+Medição por etapa das verificações: tempo, itens por segundo e memória
+(quanto o pico de RSS do processo subiu durante a etapa, mais o pico dos
+processos filhos encerrados nela; ou, com tracemalloc, o pico de alocações
+Python da etapa). Opcionalmente grava um perfil cProfile (.prof) por etapa,
+para abrir com pstats ou snakeviz.
+
+Autor: Thiago Fernandes Motta
+Data: Dezembro 2025
+"""
+
+import cProfile
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # resource só existe em Unix
+    resource = None
+
+
+@dataclass
+class StageStats:
+    """
+    Medidas de uma etapa de verificação.
+    
+    Com memory_source 'rss', peak_memory é o quanto o pico de RSS do
+    processo principal subiu durante a etapa (0 se ela ficou abaixo do pico
+    de etapas anteriores) e children_peak_memory o pico de RSS do maior
+    processo filho encerrado na etapa (workers de um pool), se houve um.
+    """
+    name: str
+    elapsed: float
+    items: int = 0
+    peak_memory: Optional[int] = None
+    memory_source: Optional[str] = None
+    children_peak_memory: Optional[int] = None
+    
+    @property
+    def throughput(self) -> float:
+        """Itens por segundo (0 se a etapa não teve duração mensurável)."""
+        return self.items / self.elapsed if self.elapsed > 0 else 0.0
+    
+    def __str__(self):
+        memory = "-"
+        if self.memory_source == 'rss':
+            memory = f"+{self.peak_memory / 2**20:,.1f} MiB (pico RSS)"
+        elif self.peak_memory is not None:
+            memory = f"{self.peak_memory / 2**20:,.1f} MiB ({self.memory_source})"
+        if self.children_peak_memory is not None:
+            memory += f", filhos {self.children_peak_memory / 2**20:,.1f} MiB"
+        return (f"{self.name:<12} {self.elapsed:>9.3f}s {self.items:>14,} itens "
+                f"{self.throughput:>14,.0f}/s  memória {memory}")
+
+
+def peak_rss(children: bool = False) -> Optional[int]:
+    """
+    Pico de memória residente em bytes desde o início do processo (None se
+    indisponível). Com children, o do maior processo filho já encerrado.
+    """
+    if resource is None:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux reporta em KiB, macOS em bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class StageRecorder:
+    """
+    Coletor das medidas por etapa de uma verificação.
+    
+    Example:
+        >>> rec = StageRecorder()
+        >>> with rec.stage('soma') as st:
+        ...     st.items = sum(1 for _ in range(1000))
+        >>> rec.stages[0].name, rec.stages[0].items
+        ('soma', 1000)
+    """
+    
+    def __init__(self, trace_memory: bool = False, profile_dir: Optional[str] = None,
+                 prefix: str = ''):
+        """
+        Args:
+            trace_memory: Medir o pico de alocações da etapa com tracemalloc
+                (mais preciso, porém mais lento) em vez do pico de RSS
+            profile_dir: Diretório dos arquivos .prof (None = sem cProfile)
+            prefix: Prefixo dos nomes dos arquivos .prof
+        """
+        self.trace_memory = trace_memory
+        self.profile_dir = profile_dir
+        self.prefix = prefix
+        self.stages: List[StageStats] = []
+    
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageStats]:
+        """
+        Mede o bloco como a etapa name; o chamador preenche stats.items.
+        """
+        stats = StageStats(name, 0.0)
+        profiler = cProfile.Profile() if self.profile_dir is not None else None
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+        rss_before, children_before = peak_rss(), peak_rss(children=True)
+        
+        start = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield stats
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            stats.elapsed = time.perf_counter() - start
+            
+            if self.trace_memory:
+                stats.peak_memory = tracemalloc.get_traced_memory()[1]
+                stats.memory_source = 'tracemalloc'
+                if started_tracing:
+                    tracemalloc.stop()
+            elif rss_before is not None:
+                # ru_maxrss só cresce: a diferença é o que esta etapa somou ao pico
+                stats.peak_memory = peak_rss() - rss_before
+                stats.memory_source = 'rss'
+            children_after = peak_rss(children=True)
+            if children_after is not None and children_after > children_before:
+                stats.children_peak_memory = children_after
+            
+            if profiler is not None:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                profiler.dump_stats(
+                    os.path.join(self.profile_dir, f'{self.prefix}{name}.prof'))
+            self.stages.append(stats)
+    
+    def add(self, name: str, elapsed: float, items: int = 0) -> StageStats:
+        """
+        Registra uma etapa medida por fora (ex.: tempos somados dos
+        segmentos processados em outros processos).
+        """
+        stats = StageStats(name, elapsed, items)
+        self.stages.append(stats)
+        return stats
+
+
+def format_stages(stages: List[StageStats]) -> str:
+    """Tabela de texto com uma linha por etapa."""
+    return '\n'.join(str(stage) for stage in stages)
+
+
+def record_stage(recorder: Optional[StageRecorder], name: str):
+    """recorder.stage(name), ou um contexto inerte se recorder for None."""
+    if recorder is None:
+        return nullcontext(StageStats(name, 0.0))
+    return recorder.stage(name)
@@ -0,0 +1,550 @@
+"""
+XOR_dist Storage
+================
+
+Cache persistente do crivo compacto (PrimeSieve) no diretório data/.
+
+Cada arquivo guarda o bitmap de ímpares precedido de um cabeçalho com o
+limite coberto e o SHA-256 do conteúdo. As execuções seguintes abrem o
+arquivo com mmap, reaproveitam qualquer crivo que cubra o limite pedido e
+estendem o maior disponível quando ele é curto demais. Arquivos corrompidos
+são detectados pelo checksum e reconstruídos.
+
+Também guarda os checkpoints JSON das verificações longas (gravação
+atômica), usados para retomar uma execução interrompida, e a tabela dos
+valores de π₂(x) já contados; e exporta os dados derivados do crivo
+(primos, gêmeos, xor_dist, v₂, gaps) como colunas .npy reabertas via mmap,
+sem crivar de novo.
+
+Autor: Thiago Fernandes Motta
+Data: Dezembro 2025
+"""
+
+import ast
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+from array import array
+from functools import cached_property
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional
+    np = None
+
+from core import PrimeSieve, DEFAULT_SEGMENT_SIZE, xor_dist, v2
+
+
+# Diretório padrão: <raiz do projeto>/data
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data'
+)
+
+# Cabeçalho: magic, limite, tamanho do bitmap, SHA-256 do bitmap
+_MAGIC = b'XDSIEVE1'
+_HEADER = struct.Struct('<8sQQ32s')
+_HEADER_SIZE = 64
+
+_SIEVE_FILE = re.compile(r'^primes_(\d+)\.sieve$')
+
+
+class CorruptCacheError(Exception):
+    """Arquivo de cache com cabeçalho inválido ou checksum divergente."""
+
+
+def sieve_path(limit: int, cache_dir: str = DEFAULT_CACHE_DIR) -> str:
+    """Caminho do arquivo de cache para um crivo até limit."""
+    return os.path.join(cache_dir, f'primes_{limit}.sieve')
+
+
+def cached_sieves(cache_dir: str = DEFAULT_CACHE_DIR) -> List[Tuple[int, str]]:
+    """
+    Lista os crivos presentes no cache.
+    
+    Returns:
+        Lista de (limite, caminho) em ordem crescente de limite
+    """
+    if not os.path.isdir(cache_dir):
+        return []
+    found = []
+    for name in os.listdir(cache_dir):
+        match = _SIEVE_FILE.match(name)
+        if match:
+            found.append((int(match.group(1)), os.path.join(cache_dir, name)))
+    return sorted(found)
+
+
+def save_sieve(sieve: PrimeSieve, cache_dir: str = DEFAULT_CACHE_DIR) -> str:
+    """
+    Grava o crivo no cache (escrita atômica via arquivo temporário).
+    
+    Returns:
+        Caminho do arquivo gravado
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    payload = sieve.bits
+    digest = hashlib.sha256(payload).digest()
+    header = _HEADER.pack(_MAGIC, sieve.limit, len(payload), digest)
+    
+    path = sieve_path(sieve.limit, cache_dir)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(header.ljust(_HEADER_SIZE, b'\0'))
+            f.write(payload)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return path
+
+
+def open_sieve(path: str, verify: bool = True) -> PrimeSieve:
+    """
+    Abre um crivo do cache via mmap (somente leitura).
+    
+    Args:
+        path: Arquivo .sieve
+        verify: Conferir o SHA-256 do bitmap
+        
+    Raises:
+        CorruptCacheError: cabeçalho inválido, arquivo truncado ou
+            checksum divergente
+    """
+    with open(path, 'rb') as f:
+        header = f.read(_HEADER_SIZE)
+        if len(header) < _HEADER.size:
+            raise CorruptCacheError(f"{path}: cabeçalho truncado")
+        magic, limit, nbytes, digest = _HEADER.unpack_from(header)
+        if magic != _MAGIC:
+            raise CorruptCacheError(f"{path}: formato desconhecido")
+        if os.fstat(f.fileno()).st_size != _HEADER_SIZE + nbytes:
+            raise CorruptCacheError(f"{path}: tamanho inconsistente")
+        if nbytes == 0:
+            return PrimeSieve.from_bits(limit, b'')
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    bits = memoryview(mapped)[_HEADER_SIZE:]
+    if verify and hashlib.sha256(bits).digest() != digest:
+        raise CorruptCacheError(f"{path}: checksum divergente")
+    return PrimeSieve.from_bits(limit, bits)
+
+
+def find_cached_sieve(limit: int, cache_dir: str = DEFAULT_CACHE_DIR,
+                      verbose: bool = False) -> Optional[str]:
+    """
+    Caminho do menor crivo íntegro em cache que cobre limit, sem crivar
+    nada. Arquivos corrompidos são removidos e ignorados.
+    
+    Returns:
+        Caminho do arquivo .sieve, ou None se nenhum cobre limit
+    """
+    for cached_limit, path in cached_sieves(cache_dir):
+        if cached_limit < limit:
+            continue
+        try:
+            open_sieve(path)
+        except CorruptCacheError as e:
+            if verbose:
+                print(f"Cache corrompido, removendo: {e}")
+            os.unlink(path)
+            continue
+        if verbose:
+            print(f"Crivo reaproveitado do cache (limite {cached_limit:,})")
+        return path
+    return None
+
+
+def cached_sieve_path(limit: int, cache_dir: str = DEFAULT_CACHE_DIR,
+                      segment_size: int = DEFAULT_SEGMENT_SIZE,
+                      verbose: bool = False) -> str:
+    """
+    Caminho de um crivo em cache que cobre limit, criando-o se necessário.
+    
+    Usa o menor crivo em cache que cubra limit (find_cached_sieve); se
+    nenhum cobre, estende o maior disponível (ou crivo do zero) e grava o
+    resultado. Arquivos corrompidos são removidos e ignorados. O arquivo
+    devolvido pode ter limite maior que limit (não é necessariamente
+    sieve_path(limit)).
+    
+    Args:
+        limit: Limite superior (inclusivo)
+        cache_dir: Diretório do cache
+        segment_size: Tamanho do segmento para crivar a parte faltante
+        verbose: Mostrar o que foi reaproveitado
+        
+    Returns:
+        Caminho do arquivo .sieve
+    """
+    path = find_cached_sieve(limit, cache_dir, verbose)
+    if path is not None:
+        return path
+    
+    best: Optional[PrimeSieve] = None
+    best_path = None
+    
+    # Do maior para o menor: o primeiro crivo íntegro é o melhor ponto de partida
+    for cached_limit, path in cached_sieves(cache_dir)[::-1]:
+        try:
+            best = open_sieve(path)
+            best_path = path
+            break
+        except CorruptCacheError as e:
+            if verbose:
+                print(f"Cache corrompido, removendo: {e}")
+            os.unlink(path)
+    
+    if best is not None:
+        if verbose:
+            print(f"Estendendo crivo em cache de {best.limit:,} até {limit:,}...")
+        sieve = best.extend(limit, segment_size)
+    else:
+        if verbose:
+            print(f"Crivando até {limit:,} (cache vazio)...")
+        sieve = PrimeSieve(limit, segment_size)
+    
+    path = save_sieve(sieve, cache_dir)
+    if best_path is not None and best_path != path:
+        os.unlink(best_path)
+    return path
+
+
+def load_sieve(limit: int, cache_dir: str = DEFAULT_CACHE_DIR,
+               segment_size: int = DEFAULT_SEGMENT_SIZE,
+               verbose: bool = False) -> PrimeSieve:
+    """
+    Obtém o crivo até limit a partir do cache, criando-o se necessário
+    (ver cached_sieve_path).
+    
+    Returns:
+        PrimeSieve com limite exatamente igual a limit
+    """
+    sieve = open_sieve(cached_sieve_path(limit, cache_dir, segment_size, verbose),
+                       verify=False)
+    if sieve.limit == limit:
+        return sieve
+    return PrimeSieve.from_bits(limit, sieve.bits)
+
+
+# =============================================================================
+# CHECKPOINTS DE VERIFICAÇÃO
+# =============================================================================
+
+def checkpoint_path(name: str, limit: int, cache_dir: str = DEFAULT_CACHE_DIR) -> str:
+    """Caminho do checkpoint da verificação name até limit."""
+    return os.path.join(cache_dir, f'{name}_{limit}.checkpoint.json')
+
+
+def save_checkpoint(path: str, state: Dict) -> str:
+    """
+    Grava o estado de uma verificação como JSON (escrita atômica: um
+    arquivo temporário substitui o anterior só depois de completo).
+    
+    Returns:
+        Caminho do arquivo gravado
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return path
+
+
+def load_checkpoint(path: str) -> Optional[Dict]:
+    """
+    Lê um checkpoint gravado por save_checkpoint.
+    
+    Returns:
+        Estado salvo, ou None se o arquivo não existe
+        
+    Raises:
+        CorruptCacheError: conteúdo que não é JSON válido
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except ValueError as e:
+        raise CorruptCacheError(f"{path}: checkpoint inválido ({e})") from e
+
+
+# =============================================================================
+# TABELA DE π₂(x)
+# =============================================================================
+
+def twin_counts_path(cache_dir: str = DEFAULT_CACHE_DIR) -> str:
+    """Caminho da tabela persistente de π₂(x)."""
+    return os.path.join(cache_dir, 'twin_counts.json')
+
+
+def load_twin_counts(cache_dir: str = DEFAULT_CACHE_DIR) -> Dict[int, int]:
+    """
+    Lê a tabela {x: π₂(x)} gravada por save_twin_counts.
+    
+    Returns:
+        Tabela (vazia se o arquivo não existe)
+        
+    Raises:
+        CorruptCacheError: arquivo que não é uma tabela de contagens
+    """
+    path = twin_counts_path(cache_dir)
+    state = load_checkpoint(path)
+    if state is None:
+        return {}
+    try:
+        return {int(x): int(count) for x, count in state['counts'].items()}
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        raise CorruptCacheError(f"{path}: tabela de π₂ inválida ({e})") from e
+
+
+def save_twin_counts(table: Dict[int, int], cache_dir: str = DEFAULT_CACHE_DIR) -> str:
+    """
+    Grava a tabela {x: π₂(x)} (escrita atômica, como os checkpoints).
+    
+    Returns:
+        Caminho do arquivo gravado
+    """
+    counts = {str(x): table[x] for x in sorted(table)}
+    return save_checkpoint(twin_counts_path(cache_dir), {'counts': counts})
+
+# =============================================================================
+# EXPORTAÇÃO BINÁRIA (.npy)
+# =============================================================================
+
+_NPY_MAGIC = b'\x93NUMPY\x01\x00'
+
+# typecode do array -> descr do .npy (sempre little-endian)
+_NPY_DESCR = {'B': '|u1', 'H': '<u2', 'I': '<u4', 'Q': '<u8'}
+_NPY_TYPECODE = {descr: code for code, descr in _NPY_DESCR.items()}
+
+DATASET_COLUMNS = ('primes', 'twin_lows', 'xor_dist', 'v2', 'gaps')
+
+
+def dataset_path(limit: int, cache_dir: str = DEFAULT_CACHE_DIR) -> str:
+    """Diretório do conjunto exportado até limit."""
+    return os.path.join(cache_dir, f'dataset_{limit}')
+
+
+def _npy_header(typecode: str, length: int) -> bytes:
+    """Cabeçalho .npy versão 1.0 de um vetor 1-D (alinhado a 64 bytes)."""
+    header = (f"{{'descr': '{_NPY_DESCR[typecode]}', 'fortran_order': False, "
+              f"'shape': ({length},), }}")
+    padding = -(len(_NPY_MAGIC) + 2 + len(header) + 1) % 64
+    header = (header + ' ' * padding + '\n').encode('latin1')
+    return _NPY_MAGIC + struct.pack('<H', len(header)) + header
+
+
+def _write_column(f, typecode: str, values):
+    """Acrescenta valores ao arquivo como inteiros little-endian."""
+    block = array(typecode, values)
+    if sys.byteorder == 'big':
+        block.byteswap()
+    f.write(block.tobytes())
+
+
+def _open_npy(path: str):
+    """
+    Abre um vetor .npy 1-D via mmap, sem cópia: ndarray somente leitura
+    com NumPy, memoryview tipado sem ele.
+    """
+    with open(path, 'rb') as f:
+        prefix = f.read(len(_NPY_MAGIC) + 2)
+        if prefix[:len(_NPY_MAGIC)] != _NPY_MAGIC:
+            raise CorruptCacheError(f"{path}: não é um .npy versão 1.0")
+        header_len, = struct.unpack('<H', prefix[len(_NPY_MAGIC):])
+        header = ast.literal_eval(f.read(header_len).decode('latin1'))
+        offset = len(prefix) + header_len
+        typecode = _NPY_TYPECODE.get(header['descr'])
+        if typecode is None or header['fortran_order'] or len(header['shape']) != 1:
+            raise CorruptCacheError(f"{path}: formato de coluna não suportado")
+        length, = header['shape']
+        itemsize = array(typecode).itemsize
+        if os.fstat(f.fileno()).st_size != offset + length * itemsize:
+            raise CorruptCacheError(f"{path}: tamanho inconsistente")
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    if np is not None:
+        return np.frombuffer(mapped, dtype=header['descr'], count=length, offset=offset)
+    if sys.byteorder == 'big' and itemsize > 1:
+        raise CorruptCacheError(f"{path}: leitura sem NumPy exige máquina little-endian")
+    return memoryview(mapped)[offset:].cast(typecode)
+
+
+def export_dataset(limit: int, cache_dir: str = DEFAULT_CACHE_DIR,
+                   segment_size: int = DEFAULT_SEGMENT_SIZE,
+                   columns: Tuple[str, ...] = DATASET_COLUMNS,
+                   verbose: bool = False) -> str:
+    """
+    Exporta os dados derivados do crivo até limit como colunas .npy.
+    
+    Colunas (um arquivo cada em dataset_<limit>/):
+        primes     primos ≤ limit ('<u4', ou '<u8' se limit ≥ 2³²)
+        twin_lows  p dos gêmeos (p, p+2) com p + 2 ≤ limit (mesmo tipo)
+        xor_dist   xor_dist(p, p+2) de cada gêmeo ('|u1')
+        v2         v₂(p+1) de cada gêmeo ('|u1')
+        gaps       primes[i+1] - primes[i] ('<u2')
+    
+    O crivo vem do cache (load_sieve); os tamanhos são contados no bitmap
+    e cada coluna é escrita em fluxo, segmento a segmento, então a memória
+    não cresce com limit. Os arquivos abrem com numpy.load ou open_dataset.
+    
+    Args:
+        limit: Limite superior (inclusivo)
+        cache_dir: Diretório do cache (recebe o subdiretório do conjunto)
+        segment_size: Tamanho do segmento
+        columns: Subconjunto de DATASET_COLUMNS a exportar
+        verbose: Mostrar progresso
+        
+    Returns:
+        Diretório do conjunto exportado
+    """
+    unknown = set(columns) - set(DATASET_COLUMNS)
+    if unknown:
+        raise ValueError(f"colunas desconhecidas: {sorted(unknown)}")
+    
+    sieve = load_sieve(limit, cache_dir, segment_size, verbose=verbose)
+    n_primes = sieve.count()
+    n_twins = sieve.count_twins()
+    wide = 'Q' if limit >= 2**32 else 'I'
+    layout = {
+        'primes': (wide, n_primes),
+        'twin_lows': (wide, n_twins),
+        'xor_dist': ('B', n_twins),
+        'v2': ('B', n_twins),
+        'gaps': ('H', max(n_primes - 1, 0)),
+    }
+    
+    directory = dataset_path(limit, cache_dir)
+    os.makedirs(directory, exist_ok=True)
+    files = {}
+    try:
+        for name in columns:
+            typecode, length = layout[name]
+            files[name] = open(os.path.join(directory, f'{name}.npy.tmp'), 'wb')
+            files[name].write(_npy_header(typecode, length))
+        
+        previous = None
+        for low in range(0, limit + 1, segment_size):
+            high = min(low + segment_size, limit + 1)
+            if 'primes' in files or 'gaps' in files:
+                block = list(sieve.primes(low, high))
+                if 'primes' in files:
+                    _write_column(files['primes'], wide, block)
+                if 'gaps' in files and block:
+                    edges = ([previous] if previous is not None else []) + block
+                    _write_column(files['gaps'], 'H',
+                                  [b - a for a, b in zip(edges, edges[1:])])
+                    previous = block[-1]
+            if {'twin_lows', 'xor_dist', 'v2'} & files.keys():
+                lows = list(sieve.twin_lows(low, high))
+                if 'twin_lows' in files:
+                    _write_column(files['twin_lows'], wide, lows)
+                if 'xor_dist' in files:
+                    _write_column(files['xor_dist'], 'B', [xor_dist(p, p + 2) for p in lows])
+                if 'v2' in files:
+                    _write_column(files['v2'], 'B', [v2(p + 1) for p in lows])
+            if verbose:
+                print(f"  Exportado até {high - 1:,}")
+    except BaseException:
+        for f in files.values():
+            f.close()
+            os.unlink(f.name)
+        raise
+    
+    for name, f in files.items():
+        f.close()
+        os.chmod(f.name, 0o644)
+        os.replace(f.name, os.path.join(directory, f'{name}.npy'))
+    
+    meta = {'limit': limit, 'columns': {name: {'dtype': _NPY_DESCR[layout[name][0]],
+                                               'length': layout[name][1]}
+                                        for name in columns}}
+    save_checkpoint(os.path.join(directory, 'meta.json'), meta)
+    return directory
+
+
+class Dataset:
+    """
+    Conjunto exportado por export_dataset, com as colunas mapeadas em
+    memória sob demanda (abrir não lê os dados).
+    
+    Example:
+        >>> import tempfile
+        >>> d = open_dataset(export_dataset(10**4, tempfile.mkdtemp()))
+        >>> len(d), int(d.twin_lows[-1]), int(d.v2[-1]), len(d.primes)
+        (205, 9929, 1, 1229)
+    """
+    
+    def __init__(self, directory: str):
+        meta = load_checkpoint(os.path.join(directory, 'meta.json'))
+        if meta is None:
+            raise FileNotFoundError(f"{directory}: conjunto exportado não encontrado")
+        self.directory = directory
+        self.limit = meta['limit']
+        self.columns = meta['columns']
+    
+    def column(self, name: str):
+        """Coluna name via mmap (ndarray com NumPy, memoryview sem ele)."""
+        if name not in self.columns:
+            raise KeyError(f"coluna {name!r} não exportada em {self.directory}")
+        return _open_npy(os.path.join(self.directory, f'{name}.npy'))
+    
+    @cached_property
+    def primes(self):
+        return self.column('primes')
+    
+    @cached_property
+    def twin_lows(self):
+        return self.column('twin_lows')
+    
+    @cached_property
+    def xor_dist(self):
+        return self.column('xor_dist')
+    
+    @cached_property
+    def v2(self):
+        return self.column('v2')
+    
+    @cached_property
+    def gaps(self):
+        return self.column('gaps')
+    
+    def __len__(self) -> int:
+        """Número de pares de gêmeos."""
+        for name in ('twin_lows', 'xor_dist', 'v2'):
+            if name in self.columns:
+                return self.columns[name]['length']
+        return 0
+    
+    def __repr__(self):
+        return f"Dataset(limit={self.limit:,}, columns={sorted(self.columns)})"
+
+
+def open_dataset(path_or_limit, cache_dir: str = DEFAULT_CACHE_DIR) -> Dataset:
+    """
+    Abre um conjunto exportado, por diretório ou pelo limite.
+    
+    Args:
+        path_or_limit: Diretório de export_dataset, ou o limit exportado
+        cache_dir: Diretório do cache (quando path_or_limit é um limite)
+    """
+    if isinstance(path_or_limit, int):
+        path_or_limit = dataset_path(path_or_limit, cache_dir)
+    return Dataset(path_or_limit)
@@ -8,15 +8,34 @@ Autor: Thiago Fernandes Motta
 Data: Dezembro 2025
 """
 
+import os
+import random
 import time
-from typing import List, Tuple, Dict, Optional
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Iterator, List, Tuple, Dict, Optional
+from dataclasses import dataclass, field
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional
+    np = None
+
 from core import (
-    xor_dist, v2, popcount, trailing_ones,
-    sieve_of_eratosthenes, twin_primes, prime_pairs_with_gap,
-    verify_theorem_single, verify_theorem_batch,
-    distribution_stats
+    xor_dist, v2, popcount, trailing_ones, xor_dist_batch, v2_batch,
+    wheel_twin_primes, DEFAULT_SEGMENT_SIZE,
+    verify_theorem_single, theorem_details, xor_dist_distribution,
+    mersenne_primes, ExtremesCollector, DistributionAccumulator,
+    chi2_sf, chi2_critical_value, random_twin_prime,
+    count_twins, hardy_littlewood_twins
 )
+from storage import (
+    DEFAULT_CACHE_DIR, open_sieve, cached_sieve_path, find_cached_sieve,
+    checkpoint_path, save_checkpoint, load_checkpoint,
+    load_twin_counts, save_twin_counts
+)
+from context import AnalysisContext
+from instrumentation import StageStats, StageRecorder, record_stage, format_stages
 
 
 @dataclass
@@ -28,6 +47,9 @@ class VerificationResult:
     counterexamples: List[Dict]
     execution_time: float
     is_proven: bool
+    distribution: Dict[int, int] = field(default_factory=dict)
+    stages: List[StageStats] = field(default_factory=list)
+    extremes: Dict = field(default_factory=dict)
     
     def __str__(self):
         status = "✓ VERIFICADO" if self.is_proven else "✗ FALHOU"
@@ -45,56 +67,342 @@ class VerificationResult:
         )
 
 
+# Ímpares por bloco na verificação vetorizada do corolário
+CHUNK_ODDS = 1 << 20
+
+# Intervalo mínimo (segundos) entre gravações de checkpoint
+CHECKPOINT_INTERVAL = 60.0
+
+# Segmento mínimo das janelas longe do zero (start > 0): com primos-base até
+# 2^20, segmentos menores gastam mais no crivo por primo-base que nos gêmeos
+WINDOW_SEGMENT_SIZE = 1 << 24
+
+# Distância entre as entradas gravadas na tabela de π₂ durante uma contagem
+TWIN_COUNT_STEP = 10**9
+
+
+def _resume_state(checkpoint: Optional[str], resume: bool, params: Dict) -> Optional[Dict]:
+    """
+    Estado salvo em checkpoint, se resume e o checkpoint existe.
+    
+    Raises:
+        ValueError: checkpoint gravado com outros parâmetros (params)
+    """
+    if checkpoint is None or not resume:
+        return None
+    state = load_checkpoint(checkpoint)
+    if state is None:
+        return None
+    saved = {key: state.get(key) for key in params}
+    if saved != params:
+        raise ValueError(f"checkpoint {checkpoint} não corresponde a esta execução: "
+                         f"{saved} ≠ {params}")
+    return state
+
+
 # =============================================================================
 # VERIFICAÇÃO DO TEOREMA PRINCIPAL
 # =============================================================================
 
-def verify_main_theorem(limit: int = 10**6, verbose: bool = True) -> VerificationResult:
+def _segment_twins(low: int, high: int,
+                   sieve_file: Optional[str] = None) -> Iterator[Tuple[int, int]]:
+    """
+    Gêmeos (p, p+2) com low ≤ p < high: crivo de gêmeos da roda 6 sobre a
+    janela [low, high+2) ou leitura do bitmap do crivo em cache sieve_file.
+    """
+    if sieve_file is not None:
+        lows = open_sieve(sieve_file, verify=False).twin_lows(low, high)
+        return ((p, p + 2) for p in lows)
+    return wheel_twin_primes(high + 1, start=low, segment_size=high - low + 2)
+
+
+def _verify_twin_segment(low: int, high: int, sieve_file: Optional[str] = None) -> Dict:
+    """
+    Verifica o teorema para os gêmeos (p, p+2) com low ≤ p < high.
+    
+    Unidade de trabalho do verify_main_theorem (serial ou em processos):
+    crivo da janela [low, high+2) — ou leitura dela no crivo em cache
+    sieve_file — e devolve apenas contagens, contra-exemplos, o histograma
+    de xor_dist, os casos extremos (ExtremesCollector) e o tempo de cada
+    fase, prontos para a fusão final.
+    """
+    total = 0
+    verified = 0
+    counterexamples = []
+    histogram = {}
+    extremes = ExtremesCollector()
+    
+    start = time.perf_counter()
+    twins = list(_segment_twins(low, high, sieve_file))
+    sieved = time.perf_counter()
+    
+    for p, q in twins:
+        total += 1
+        d = xor_dist(p, q)
+        v2_val = v2(p + 1)
+        if d == v2_val:
+            verified += 1
+        else:
+            counterexamples.append(theorem_details(p))
+        histogram[d] = histogram.get(d, 0) + 1
+        extremes.add(p, q, d, v2_val)
+    
+    return {
+        'low': low,
+        'high': high,
+        'total': total,
+        'verified': verified,
+        'counterexamples': counterexamples,
+        'histogram': histogram,
+        'extremes': extremes,
+        'sieve_time': sieved - start,
+        'verify_time': time.perf_counter() - sieved
+    }
+
+
+def _segment_bounds(limit: int, segment_size: int,
+                    start: int = 0) -> Tuple[List[int], List[int]]:
+    """
+    Divide os valores possíveis de p (start ≤ p, p + 2 ≤ limit) em segmentos
+    [low, high) de segment_size inteiros.
+    """
+    stop = max(limit - 1, 0)
+    lows = list(range(max(start, 0), stop, segment_size))
+    highs = [min(low + segment_size, stop) for low in lows]
+    return lows, highs
+
+
+def verify_main_theorem(limit: int = 10**6, verbose: bool = True,
+                        segment_size: int = DEFAULT_SEGMENT_SIZE,
+                        workers: Optional[int] = None,
+                        cache_dir: Optional[str] = None,
+                        context: Optional[AnalysisContext] = None,
+                        checkpoint: Optional[str] = None,
+                        resume: bool = False,
+                        recorder: Optional[StageRecorder] = None,
+                        start: int = 0,
+                        stop: Optional[int] = None) -> VerificationResult:
     """
     Verifica o teorema principal: xor_dist(p, p+2) = v₂(p+1) para twins.
     
+    O intervalo [start, limit] é dividido em segmentos; cada um é crivado e
+    verificado isoladamente, então a memória fica em O(√limit + segment_size).
+    Com start > 0 só a janela é crivada (wheel_twin_primes, primos-base até
+    √limit), então uma janela perto de 10^18 não exige crivar a partir de 2.
+    Com workers > 1 os segmentos rodam em um ProcessPoolExecutor e apenas
+    contagens, contra-exemplos e histogramas voltam para a fusão.
+    
+    Com checkpoint, o estado da fusão (próximo segmento, contagens,
+    histograma, contra-exemplos e tempo decorrido) é gravado a cada
+    CHECKPOINT_INTERVAL segundos; com resume=True a execução continua do
+    último checkpoint e o resultado final é o mesmo de uma execução
+    ininterrupta. O arquivo é removido ao final.
+    
     Args:
         limit: Limite superior para busca de primos
         verbose: Mostrar progresso
+        segment_size: Tamanho do segmento do crivo
+        workers: Número de processos (None ou 1 = serial, 0 = todos os núcleos)
+        cache_dir: Diretório do cache de crivos; se informado, os segmentos
+            são lidos do crivo em cache (criado/estendido se necessário; com
+            workers > 1 e sem crivo que cubra limit, cada processo criva o
+            próprio segmento e o cache não é gravado)
+        context: Contexto de análise; em execução serial e sem checkpoint,
+            reaproveita os gêmeos, xor_dist e v₂ já calculados (limit e
+            cache_dir vêm dele)
+        checkpoint: Arquivo de checkpoint (None = sem checkpoint; com
+            resume=True, o padrão é checkpoint_path('main_theorem', limit))
+        resume: Continuar a partir do checkpoint, se ele existir
+        recorder: Coletor das medidas por etapa (tempo, itens/s, memória);
+            as etapas medidas vão para VerificationResult.stages
+        start: Menor p verificado (start > 0 ignora context e cache_dir e usa
+            segmentos de pelo menos WINDOW_SEGMENT_SIZE)
+        stop: Maior p + 2 verificado (sinônimo de limit)
         
     Returns:
-        Resultado da verificação
+        Resultado da verificação; distribution e extremes (formato de
+        find_extreme_cases) saem da mesma passada, já combinados entre os
+        segmentos
     """
     start_time = time.time()
     
-    if verbose:
-        print(f"Gerando primos até {limit:,}...")
-    primes = sieve_of_eratosthenes(limit)
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    if stop is not None:
+        limit = stop
+    if start > 0:
+        context = None
+        cache_dir = None
+        segment_size = max(segment_size, WINDOW_SEGMENT_SIZE)
     
-    if verbose:
-        print(f"Encontrando primos gêmeos...")
-    twins = twin_primes(primes)
+    if context is not None:
+        limit = context.limit
+        cache_dir = context.cache_dir
+        if not (workers and workers > 1) and checkpoint is None and not resume:
+            return _verify_main_theorem_context(context, start_time, verbose, recorder)
+    
+    if resume and checkpoint is None:
+        checkpoint = checkpoint_path('main_theorem', limit, cache_dir or DEFAULT_CACHE_DIR)
+    params = {'theorem': 'main', 'start': start, 'limit': limit,
+              'segment_size': segment_size}
+    state = _resume_state(checkpoint, resume, params)
     
     if verbose:
-        print(f"Verificando teorema para {len(twins):,} pares...")
+        if start > 0:
+            print(f"Verificando teorema para primos gêmeos em [{start:,}, {limit:,}]...")
+        else:
+            print(f"Verificando teorema para primos gêmeos até {limit:,}...")
+        if workers and workers > 1:
+            print(f"  Usando {workers} processos")
+    
+    lows, highs = _segment_bounds(limit, segment_size, start)
+    sieve_files = [None] * len(lows)
+    if cache_dir is not None:
+        with record_stage(recorder, 'cache') as stage:
+            if workers and workers > 1:
+                # Sem crivo em cache, cada processo crivará o próprio segmento
+                # (montar o crivo inteiro aqui serializaria o trabalho)
+                sieve_file = find_cached_sieve(limit, cache_dir, verbose=verbose)
+            else:
+                sieve_file = cached_sieve_path(limit, cache_dir, segment_size,
+                                               verbose=verbose)
+            stage.items = limit if sieve_file is not None else 0
+        sieve_files = [sieve_file] * len(lows)
     
+    total = 0
     verified = 0
     counterexamples = []
+    histogram = {}
+    extremes = ExtremesCollector()
+    sieve_time = 0.0
+    verify_time = 0.0
+    done = 0
+    previous_time = 0.0
     
-    for i, (p, q) in enumerate(twins):
-        success, details = verify_theorem_single(p)
-        if success:
-            verified += 1
+    if state is not None:
+        total = state['total']
+        verified = state['verified']
+        counterexamples = state['counterexamples']
+        histogram = {int(d): count for d, count in state['histogram'].items()}
+        if 'extremes' not in state:
+            raise ValueError(f"checkpoint {checkpoint} não tem os casos extremos "
+                             f"(formato anterior); execute sem resume")
+        extremes = ExtremesCollector.from_state(state['extremes'])
+        done = state['next_segment']
+        previous_time = state['execution_time']
+        if verbose:
+            print(f"  Retomando do checkpoint: {total:,} pares, "
+                  f"segmento {done:,}/{len(lows):,}")
+    
+    next_report = (total // 10000 + 1) * 10000
+    last_save = time.time()
+    
+    def save():
+        save_checkpoint(checkpoint, dict(
+            params, next_segment=done, total=total, verified=verified,
+            counterexamples=counterexamples, histogram=histogram,
+            extremes=extremes.state(),
+            execution_time=previous_time + time.time() - start_time
+        ))
+    
+    def merge(partials):
+        nonlocal total, verified, sieve_time, verify_time, done, next_report, last_save
+        for part in partials:
+            total += part['total']
+            verified += part['verified']
+            sieve_time += part['sieve_time']
+            verify_time += part['verify_time']
+            counterexamples.extend(part['counterexamples'])
+            for d, count in part['histogram'].items():
+                histogram[d] = histogram.get(d, 0) + count
+            extremes.merge(part['extremes'])
+            done += 1
+            
+            if verbose and total >= next_report:
+                print(f"  Progresso: {total:,} pares (até {part['high'] - 1:,})")
+                next_report = (total // 10000 + 1) * 10000
+            
+            if checkpoint is not None and time.time() - last_save >= CHECKPOINT_INTERVAL:
+                save()
+                last_save = time.time()
+    
+    pending = (lows[done:], highs[done:], sieve_files[done:])
+    first_pending = lows[done] if done < len(lows) else max(limit - 1, 0)
+    with record_stage(recorder, 'segments') as stage:
+        if workers and workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                merge(executor.map(_verify_twin_segment, *pending))
         else:
-            counterexamples.append(details)
-        
-        if verbose and (i + 1) % 10000 == 0:
-            print(f"  Progresso: {i+1:,}/{len(twins):,}")
+            merge(map(_verify_twin_segment, *pending))
+        stage.items = total
+    
+    if recorder is not None:
+        # Tempos somados dos segmentos (CPU de todos os processos)
+        recorder.add('sieve', sieve_time, max(limit - 1 - first_pending, 0))
+        recorder.add('verify', verify_time, total)
+    
+    if checkpoint is not None and os.path.exists(checkpoint):
+        os.unlink(checkpoint)
+    
+    elapsed = previous_time + time.time() - start_time
+    
+    return VerificationResult(
+        theorem="xor_dist(p, p+2) = v₂(p+1) para primos gêmeos",
+        total_cases=total,
+        verified_cases=verified,
+        counterexamples=counterexamples,
+        execution_time=elapsed,
+        is_proven=(verified == total),
+        distribution=dict(sorted(histogram.items())),
+        stages=list(recorder.stages) if recorder is not None else [],
+        extremes=extremes.result()
+    )
+
+
+def _verify_main_theorem_context(context: AnalysisContext, start_time: float,
+                                 verbose: bool,
+                                 recorder: Optional[StageRecorder] = None) -> VerificationResult:
+    """verify_main_theorem sobre os dados memoizados de um AnalysisContext."""
+    if verbose:
+        print(f"Verificando teorema para primos gêmeos até {context.limit:,}...")
+    
+    # Cada etapa do contexto é calculada (e medida) uma vez; se já estava
+    # memoizada, a medida registra só o acesso
+    with record_stage(recorder, 'sieve') as stage:
+        context.primes
+        stage.items = context.limit
+    with record_stage(recorder, 'twins') as stage:
+        stage.items = len(context.twins)
+    with record_stage(recorder, 'xor_dist') as stage:
+        stage.items = len(context.distances) + len(context.v2_values)
+    
+    total = 0
+    verified = 0
+    counterexamples = []
+    extremes = ExtremesCollector()
+    
+    with record_stage(recorder, 'verify') as stage:
+        for (p, q), d, v2_val in zip(context.twins, context.distances, context.v2_values):
+            total += 1
+            if d == v2_val:
+                verified += 1
+            else:
+                counterexamples.append(theorem_details(p))
+            extremes.add(p, q, d, v2_val)
+        stage.items = total
     
     elapsed = time.time() - start_time
     
     return VerificationResult(
         theorem="xor_dist(p, p+2) = v₂(p+1) para primos gêmeos",
-        total_cases=len(twins),
+        total_cases=total,
         verified_cases=verified,
         counterexamples=counterexamples,
         execution_time=elapsed,
-        is_proven=(verified == len(twins))
+        is_proven=(verified == total),
+        distribution=dict(context.xor_dist_distribution),
+        stages=list(recorder.stages) if recorder is not None else [],
+        extremes=extremes.result()
     )
 
 
@@ -102,15 +410,26 @@ def verify_main_theorem(limit: int = 10**6, verbose: bool = True) -> Verificatio
 # VERIFICAÇÃO DO COROLÁRIO (TODOS OS ÍMPARES)
 # =============================================================================
 
-def verify_corollary_all_odds(limit: int = 10**5, verbose: bool = True) -> VerificationResult:
+def verify_corollary_all_odds(limit: int = 10**5, verbose: bool = True,
+                              checkpoint: Optional[str] = None,
+                              resume: bool = False,
+                              recorder: Optional[StageRecorder] = None) -> VerificationResult:
     """
     Verifica o corolário: xor_dist(n, n+2) = v₂(n+1) para TODO n ímpar.
     
     Este é mais forte que o teorema (não requer primalidade).
     
+    Os ímpares são verificados em blocos de CHUNK_ODDS; com checkpoint, o
+    estado ao fim de cada bloco é gravado a cada CHECKPOINT_INTERVAL
+    segundos e resume=True continua do último bloco salvo.
+    
     Args:
         limit: Limite superior
         verbose: Mostrar progresso
+        checkpoint: Arquivo de checkpoint (None = sem checkpoint; com
+            resume=True, o padrão é checkpoint_path('corollary', limit))
+        resume: Continuar a partir do checkpoint, se ele existir
+        recorder: Coletor das medidas por etapa (VerificationResult.stages)
         
     Returns:
         Resultado da verificação
@@ -120,27 +439,78 @@ def verify_corollary_all_odds(limit: int = 10**5, verbose: bool = True) -> Verif
     if verbose:
         print(f"Verificando para todos os ímpares até {limit:,}...")
     
+    if resume and checkpoint is None:
+        checkpoint = checkpoint_path('corollary', limit, DEFAULT_CACHE_DIR)
+    params = {'theorem': 'corollary', 'limit': limit, 'chunk_odds': CHUNK_ODDS}
+    state = _resume_state(checkpoint, resume, params)
+    
     verified = 0
     counterexamples = []
     total = limit // 2
+    first = 1
+    previous_time = 0.0
     
-    for n in range(1, limit, 2):  # Todos os ímpares
-        xd = xor_dist(n, n + 2)
-        v2_val = v2(n + 1)
-        
-        if xd == v2_val:
-            verified += 1
-        else:
-            counterexamples.append({
-                'n': n,
-                'xor_dist': xd,
-                'v2': v2_val
-            })
+    if state is not None:
+        verified = state['verified']
+        counterexamples = state['counterexamples']
+        first = state['next_n']
+        previous_time = state['execution_time']
+        if verbose:
+            print(f"  Retomando do checkpoint em n = {first:,}")
+    
+    last_save = time.time()
+    step = 2 * CHUNK_ODDS
+    with record_stage(recorder, 'verify') as stage:
+        for low in range(first, limit, step):
+            high = min(low + step, limit)
+            
+            if np is not None and limit < 2**63:
+                # Bloco de ímpares verificado com os kernels vetorizados
+                n = np.arange(low, high, 2, dtype=np.uint64)
+                xd = xor_dist_batch(n, n + np.uint64(2))
+                v2_val = v2_batch(n + np.uint64(1))
+                ok = xd == v2_val
+                verified += int(np.count_nonzero(ok))
+                for i in np.flatnonzero(~ok):
+                    counterexamples.append({
+                        'n': int(n[i]),
+                        'xor_dist': int(xd[i]),
+                        'v2': int(v2_val[i])
+                    })
+                
+                if verbose:
+                    print(f"  Progresso: {verified:,}/{total:,}")
+            else:
+                for n in range(low, high, 2):  # Todos os ímpares
+                    xd = xor_dist(n, n + 2)
+                    v2_val = v2(n + 1)
+                    
+                    if xd == v2_val:
+                        verified += 1
+                    else:
+                        counterexamples.append({
+                            'n': n,
+                            'xor_dist': xd,
+                            'v2': v2_val
+                        })
+                    
+                    if verbose and verified % 10000 == 0:
+                        print(f"  Progresso: {verified:,}/{total:,}")
+            
+            if checkpoint is not None and time.time() - last_save >= CHECKPOINT_INTERVAL:
+                save_checkpoint(checkpoint, dict(
+                    params, next_n=high, verified=verified,
+                    counterexamples=counterexamples,
+                    execution_time=previous_time + time.time() - start_time
+                ))
+                last_save = time.time()
         
-        if verbose and verified % 10000 == 0:
-            print(f"  Progresso: {verified:,}/{total:,}")
+        stage.items = max(limit - first + 1, 0) // 2
     
-    elapsed = time.time() - start_time
+    if checkpoint is not None and os.path.exists(checkpoint):
+        os.unlink(checkpoint)
+    
+    elapsed = previous_time + time.time() - start_time
     
     return VerificationResult(
         theorem="xor_dist(n, n+2) = v₂(n+1) para todo n ímpar",
@@ -148,7 +518,8 @@ def verify_corollary_all_odds(limit: int = 10**5, verbose: bool = True) -> Verif
         verified_cases=verified,
         counterexamples=counterexamples,
         execution_time=elapsed,
-        is_proven=(verified == total)
+        is_proven=(verified == total),
+        stages=list(recorder.stages) if recorder is not None else []
     )
 
 
@@ -194,33 +565,199 @@ def verify_trailing_ones_equivalence(limit: int = 10**5) -> VerificationResult:
 
 
 # =============================================================================
-# VERIFICAÇÃO DA DISTRIBUIÇÃO GEOMÉTRICA
+# IDENTIDADES DE BITS DOS PRIMOS DE MERSENNE
 # =============================================================================
 
-def verify_geometric_distribution(twins: List[Tuple[int, int]], 
-                                   alpha: float = 0.01) -> Dict:
+def verify_mersenne_identities(max_exp: int = 2000, workers: Optional[int] = None,
+                               time_budget: Optional[float] = None) -> VerificationResult:
     """
-    Testa se a distribuição de xor_dist segue Geom(1/2).
+    Descobre os primos de Mersenne M = 2^n - 1 com n ≤ max_exp (Lucas–Lehmer)
+    e verifica as identidades de bits de cada um:
     
-    Usa teste qui-quadrado para comparar com distribuição teórica.
+        popcount(M) = trailing_ones(M) = v₂(M+1) = xor_dist(M, M+2) = n
     
     Args:
-        twins: Lista de pares de primos gêmeos
-        alpha: Nível de significância
+        max_exp: Maior expoente testado
+        workers: Processos para o Lucas–Lehmer (None ou 1 = serial)
+        time_budget: Tempo máximo da busca em segundos
         
     Returns:
-        Resultado do teste estatístico
+        Resultado da verificação (um caso por primo de Mersenne encontrado)
     """
-    n = len(twins)
+    start_time = time.time()
     
-    # Distribuição observada
-    observed = {}
-    for p, q in twins:
-        d = xor_dist(p, q)
-        observed[d] = observed.get(d, 0) + 1
+    found = mersenne_primes(max_exp, workers=workers, time_budget=time_budget)
+    
+    verified = 0
+    counterexamples = []
+    
+    for n, m, v2_val in found:
+        identities = {
+            'popcount': popcount(m),
+            'trailing_ones': trailing_ones(m),
+            'v2(M+1)': v2_val,
+            'xor_dist(M, M+2)': xor_dist(m, m + 2),
+        }
+        if all(value == n for value in identities.values()):
+            verified += 1
+        else:
+            counterexamples.append({'n': n, **identities})
+    
+    elapsed = time.time() - start_time
+    
+    return VerificationResult(
+        theorem="popcount(M) = trailing_ones(M) = v₂(M+1) = xor_dist(M, M+2) = n "
+                "para primos de Mersenne M = 2^n - 1",
+        total_cases=len(found),
+        verified_cases=verified,
+        counterexamples=counterexamples,
+        execution_time=elapsed,
+        is_proven=(verified == len(found))
+    )
+
+
+# =============================================================================
+# GÊMEOS DE TAMANHO CRIPTOGRÁFICO (AMOSTRAGEM)
+# =============================================================================
+
+def _sample_twin_pair(bits: int, seed: int) -> Tuple[int, bool, Dict]:
+    """Sorteia um gêmeo de bits bits e verifica o teorema nele."""
+    p, q = random_twin_prime(bits, random.Random(seed))
+    holds, details = verify_theorem_single(p)
+    return p, holds, details
+
+
+def verify_large_twins(bit_lengths: List[int] = (256, 512, 1024),
+                       samples: int = 4, workers: Optional[int] = None,
+                       seed: Optional[int] = None,
+                       verbose: bool = True) -> Dict[int, VerificationResult]:
+    """
+    Verifica o teorema em gêmeos aleatórios de tamanho criptográfico.
+    
+    Para cada tamanho, samples pares (p, p+2) com p de exatamente bits bits
+    são sorteados por random_twin_prime (pré-crivo 6k ± 1 + BPSW nos dois
+    membros) e verificados com verify_theorem_single. Os sorteios rodam em
+    um ProcessPoolExecutor com workers > 1.
+    
+    Args:
+        bit_lengths: Tamanhos de p em bits (ex.: 256 a 4096)
+        samples: Pares por tamanho
+        workers: Número de processos (None ou 1 = serial, 0 = todos os núcleos)
+        seed: Semente para reprodutibilidade (None = aleatória)
+        verbose: Mostrar pares/s de cada tamanho
+        
+    Returns:
+        Dicionário {bits: resultado}; stages traz tempo e pares/s
+    """
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    rng = random.Random(seed)
+    results = {}
+    
+    for bits in bit_lengths:
+        start_time = time.time()
+        seeds = [rng.getrandbits(64) for _ in range(samples)]
+        
+        if workers and workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                outcomes = list(executor.map(_sample_twin_pair, repeat(bits), seeds))
+        else:
+            outcomes = list(map(_sample_twin_pair, repeat(bits), seeds))
+        
+        elapsed = time.time() - start_time
+        verified = sum(1 for p, holds, details in outcomes if holds)
+        counterexamples = [details for p, holds, details in outcomes if not holds]
+        stage = StageStats(f'{bits} bits', elapsed, samples)
+        
+        results[bits] = VerificationResult(
+            theorem=f"xor_dist(p, p+2) = v₂(p+1) para gêmeos aleatórios de {bits} bits",
+            total_cases=samples,
+            verified_cases=verified,
+            counterexamples=counterexamples,
+            execution_time=elapsed,
+            is_proven=(verified == samples),
+            stages=[stage]
+        )
+        if verbose:
+            print(f"  {bits:>5} bits: {verified}/{samples} verificados, "
+                  f"{stage.throughput:.3f} pares/s")
+    
+    return results
+
+
+# =============================================================================
+# FUNÇÃO DE CONTAGEM DE GÊMEOS π₂(x)
+# =============================================================================
+
+def twin_prime_count(x: int, cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+                     workers: Optional[int] = None, step: int = TWIN_COUNT_STEP,
+                     verbose: bool = True) -> Dict:
+    """
+    π₂(x) (gêmeos com p + 2 ≤ x) comparado à previsão de Hardy–Littlewood.
+    
+    A tabela persistente {y: π₂(y)} em cache_dir é consultada primeiro: a
+    contagem parte da entrada mais próxima de x (acima ou abaixo) e só o
+    trecho entre as duas é crivado por count_twins. Subindo, π₂ é gravado a
+    cada múltiplo de step, então uma contagem longa interrompida é retomada
+    da última entrada e consultas seguintes ficam quase instantâneas.
+    
+    Args:
+        x: Limite da contagem
+        cache_dir: Diretório da tabela (None = sem tabela)
+        workers: Número de processos (None ou 1 = serial, 0 = todos os núcleos)
+        step: Distância entre as entradas gravadas durante a contagem
+        verbose: Mostrar o resultado
+        
+    Returns:
+        Dicionário com count, hardy_littlewood, ratio (count/previsão),
+        nearest (entrada da tabela usada) e execution_time
+    """
+    start_time = time.time()
+    table = load_twin_counts(cache_dir) if cache_dir is not None else {}
+    known = dict(table)
+    known.setdefault(0, 0)
+    nearest = min(known, key=lambda y: (abs(x - y), y))
+    count = known[nearest]
     
+    if nearest > x:
+        # π₂(x) = π₂(y) − #{p : x < p + 2 ≤ y}
+        count -= count_twins(nearest, start=x - 1, workers=workers)
+        table[x] = count
+    elif nearest < x:
+        low = nearest
+        for bound in list(range((nearest // step + 1) * step, x, step)) + [x]:
+            # π₂(bound) = π₂(low) + #{p : low < p + 2 ≤ bound}
+            count += count_twins(bound, start=low - 1, workers=workers)
+            low = bound
+            table[bound] = count
+            if cache_dir is not None and bound != x:
+                save_twin_counts(table, cache_dir)
+    if cache_dir is not None and nearest != x:
+        save_twin_counts(table, cache_dir)
+    
+    prediction = hardy_littlewood_twins(x)
+    result = {
+        'x': x,
+        'count': count,
+        'hardy_littlewood': prediction,
+        'ratio': count / prediction if prediction > 0 else float('nan'),
+        'nearest': nearest,
+        'execution_time': time.time() - start_time,
+    }
+    if verbose:
+        print(f"  π₂({x:,}) = {count:,}  Hardy–Littlewood: {prediction:,.0f} "
+              f"(razão {result['ratio']:.6f}, {result['execution_time']:.2f}s, "
+              f"a partir de π₂({nearest:,}))")
+    return result
+
+# =============================================================================
+# VERIFICAÇÃO DA DISTRIBUIÇÃO GEOMÉTRICA
+# =============================================================================
+
+def _geometric_chi_squared(observed: Dict[int, int], n: int, alpha: float) -> Dict:
+    """Teste χ² de um histograma de xor_dist contra Geom(1/2)."""
     # Distribuição teórica: P(k) = 2^{-k}
-    max_k = max(observed.keys())
+    max_k = max(observed.keys(), default=0)
     expected = {k: n * (2**(-k)) for k in range(1, max_k + 1)}
     
     # Qui-quadrado
@@ -242,33 +779,119 @@ def verify_geometric_distribution(twins: List[Tuple[int, int]],
             })
     
     # Graus de liberdade
-    df = len([d for d in details if d['expected'] > 5]) - 1
+    df = len(details) - 1
     
-    # Valor crítico aproximado para α = 0.01
-    # Para grandes df, χ² ~ N(df, 2*df)
-    critical_value = df + 2.33 * (2*df)**0.5  # Aproximação
+    # p-valor pela função de sobrevivência da χ²_df (gama incompleta)
+    p_value = chi2_sf(chi2, df)
     
     return {
         'chi_squared': chi2,
         'degrees_of_freedom': df,
-        'critical_value': critical_value,
-        'is_geometric': chi2 < critical_value,
+        'p_value': p_value,
+        'critical_value': chi2_critical_value(alpha, df),
+        'is_geometric': p_value >= alpha,
         'details': details,
         'n_samples': n
     }
 
 
+def verify_geometric_distribution(twins: Optional[List[Tuple[int, int]]] = None, 
+                                   alpha: float = 0.01,
+                                   context: Optional[AnalysisContext] = None,
+                                   observed: Optional[Dict[int, int]] = None) -> Dict:
+    """
+    Testa se a distribuição de xor_dist segue Geom(1/2).
+    
+    Usa teste qui-quadrado para comparar com distribuição teórica; o
+    p-valor vem da função de sobrevivência exata da χ² (chi2_sf).
+    
+    Args:
+        twins: Lista de pares de primos gêmeos
+        alpha: Nível de significância
+        context: Contexto de análise (usa o histograma já calculado)
+        observed: Histograma {xor_dist: contagem} já calculado (ex.:
+            VerificationResult.distribution)
+        
+    Returns:
+        Resultado do teste estatístico
+    """
+    if observed is not None:
+        n = sum(observed.values())
+    elif context is not None:
+        observed = context.xor_dist_distribution
+        n = len(context.twins)
+    else:
+        # Distribuição observada
+        observed = xor_dist_distribution(twins)
+        n = sum(observed.values())
+    
+    return _geometric_chi_squared(observed, n, alpha)
+
+
+def verify_geometric_multiscale(checkpoints: List[int], alpha: float = 0.01,
+                                segment_size: int = DEFAULT_SEGMENT_SIZE,
+                                cache_dir: Optional[str] = None,
+                                verbose: bool = True) -> Dict[int, Dict]:
+    """
+    Teste χ² de Geom(1/2) em várias escalas com uma única passada.
+    
+    Os gêmeos até o maior checkpoint são percorridos uma vez, segmento a
+    segmento (do crivo em cache, se cache_dir for informado); o histograma
+    acumulado é fotografado a cada checkpoint, sem recriar listas de
+    gêmeos nem refazer o histograma para cada limite.
+    
+    Args:
+        checkpoints: Limites em que o teste é feito (ex.: [10**5, 10**6, 10**7])
+        alpha: Nível de significância
+        segment_size: Tamanho do segmento do crivo
+        cache_dir: Diretório do cache de crivos
+        verbose: Imprimir uma linha por checkpoint
+        
+    Returns:
+        Dicionário {checkpoint: resultado de verify_geometric_distribution}
+    """
+    checkpoints = sorted(set(checkpoints))
+    if not checkpoints:
+        return {}
+    
+    sieve_file = None
+    if cache_dir is not None:
+        sieve_file = cached_sieve_path(checkpoints[-1], cache_dir, segment_size)
+    
+    acc = DistributionAccumulator()
+    results = {}
+    low = 0
+    for checkpoint in checkpoints:
+        # Gêmeos com p + 2 ≤ checkpoint, como em verify_main_theorem
+        stop = max(checkpoint - 1, 0)
+        for seg_low in range(low, stop, segment_size):
+            seg_high = min(seg_low + segment_size, stop)
+            acc.update_pairs(_segment_twins(seg_low, seg_high, sieve_file))
+        low = max(low, stop)
+        
+        results[checkpoint] = _geometric_chi_squared(acc.histogram, acc.count, alpha)
+        if verbose:
+            r = results[checkpoint]
+            print(f"  ≤ {checkpoint:>15,}: n = {r['n_samples']:,}, "
+                  f"χ² = {r['chi_squared']:.2f}, df = {r['degrees_of_freedom']}, "
+                  f"p = {r['p_value']:.4f}")
+    
+    return results
+
+
 # =============================================================================
 # VERIFICAÇÃO POR GAPS DIFERENTES
 # =============================================================================
 
-def verify_by_gap(limit: int = 10**6, gaps: List[int] = None) -> Dict[int, Dict]:
+def verify_by_gap(limit: int = 10**6, gaps: List[int] = None,
+                  context: Optional[AnalysisContext] = None) -> Dict[int, Dict]:
     """
     Analisa o comportamento do xor_dist para diferentes gaps.
     
     Args:
         limit: Limite para geração de primos
         gaps: Lista de gaps a analisar (default: [2, 4, 6, 8, 10, 12, 18, 30])
+        context: Contexto de análise (substitui limit)
         
     Returns:
         Dicionário com análise por gap
@@ -276,28 +899,30 @@ def verify_by_gap(limit: int = 10**6, gaps: List[int] = None) -> Dict[int, Dict]
     if gaps is None:
         gaps = [2, 4, 6, 8, 10, 12, 18, 30]
     
-    print(f"Gerando primos até {limit:,}...")
-    primes = sieve_of_eratosthenes(limit)
+    if context is None:
+        print(f"Gerando primos até {limit:,}...")
+        context = AnalysisContext(limit)
     
     results = {}
     
+    # Uma única passada pelo índice de gaps para todos os gaps pedidos
+    print(f"\nAnalisando gaps {', '.join(map(str, gaps))}...")
+    by_gap = context.gap_index.xor_dist_by_gap(gaps)
+    
     for gap in gaps:
-        print(f"\nAnalisando gap = {gap}...")
-        pairs = prime_pairs_with_gap(primes, gap)
+        stats = by_gap[gap].result()
         
-        if not pairs:
+        if not stats:
             results[gap] = {'count': 0, 'error': 'Nenhum par encontrado'}
             continue
         
-        stats = distribution_stats(pairs)
-        
         # Verifica se xor_dist mínimo corresponde a alguma propriedade do gap
         xor_min = stats['min']
         gap_popcount = popcount(gap)
         gap_v2 = v2(gap)
         
         results[gap] = {
-            'count': len(pairs),
+            'count': stats['count'],
             'mean': stats['mean'],
             'std': stats['std'],
             'entropy': stats['entropy'],
@@ -315,53 +940,104 @@ def verify_by_gap(limit: int = 10**6, gaps: List[int] = None) -> Dict[int, Dict]
 # GERAÇÃO DE CASOS DE TESTE ESPECIAIS
 # =============================================================================
 
-def find_extreme_cases(limit: int = 10**7) -> Dict:
+def _extremes_segment(low: int, high: int, sieve_file: Optional[str],
+                      top_k: int, min_v2: int) -> ExtremesCollector:
+    """Coletor de casos extremos dos gêmeos com low ≤ p < high."""
+    return ExtremesCollector(top_k, min_v2).update(_segment_twins(low, high, sieve_file))
+
+
+def find_extreme_cases(limit: int = 10**7,
+                       segment_size: int = DEFAULT_SEGMENT_SIZE,
+                       cache_dir: Optional[str] = None,
+                       context: Optional[AnalysisContext] = None,
+                       workers: Optional[int] = None,
+                       top_k: int = 20, min_v2: int = 5,
+                       start: int = 0) -> Dict:
     """
     Encontra casos extremos para análise.
     
+    Uma passada pelos gêmeos com um ExtremesCollector (heap de tamanho
+    top_k, contagem por v₂). Sem context, os segmentos do crivo (ou do
+    crivo em cache, se cache_dir for informado) são processados em série
+    ou em processos (workers > 1) e os coletores parciais são combinados.
+    Com context, usa os gêmeos já memoizados.
+    
+    Args:
+        limit: Limite superior
+        segment_size: Tamanho do segmento do crivo
+        cache_dir: Diretório do cache de crivos (com workers > 1, só lido
+            se já cobre limit)
+        context: Contexto de análise (substitui limit)
+        workers: Número de processos (None ou 1 = serial, 0 = todos os núcleos)
+        top_k: Quantidade de gêmeos de v₂ alto guardados
+        min_v2: Menor v₂(p+1) considerado alto
+        start: Menor p considerado; com start > 0 só a janela [start, limit]
+            é crivada (context e cache_dir são ignorados)
+        
     Returns:
         Dicionário com casos interessantes
     """
-    print(f"Gerando primos até {limit:,}...")
-    primes = sieve_of_eratosthenes(limit)
-    twins = twin_primes(primes)
+    collector = ExtremesCollector(top_k, min_v2)
+    if start > 0:
+        context = None
+        cache_dir = None
+        segment_size = max(segment_size, WINDOW_SEGMENT_SIZE)
     
-    # Maior xor_dist
-    max_xor = 0
-    max_xor_pair = None
+    if context is not None:
+        for (p, q), d, v2_val in zip(context.twins, context.distances, context.v2_values):
+            collector.add(p, q, d, v2_val)
+        return collector.result()
     
-    # Distribuição por v2(p+1)
-    v2_dist = {}
+    if workers == 0:
+        workers = os.cpu_count() or 1
     
-    for p, q in twins:
-        d = xor_dist(p, q)
-        v2_val = v2(p + 1)
-        
-        if d > max_xor:
-            max_xor = d
-            max_xor_pair = (p, q, d)
-        
-        v2_dist[v2_val] = v2_dist.get(v2_val, 0) + 1
+    print(f"Gerando primos até {limit:,}...")
+    lows, highs = _segment_bounds(limit, segment_size, start)
+    sieve_file = None
+    if cache_dir is not None:
+        if workers and workers > 1:
+            sieve_file = find_cached_sieve(limit, cache_dir)
+        else:
+            sieve_file = cached_sieve_path(limit, cache_dir, segment_size)
     
-    # Primos com v2(p+1) >= 5 (alto)
-    high_v2_twins = [(p, q, v2(p+1)) for p, q in twins if v2(p+1) >= 5]
+    args = (lows, highs, repeat(sieve_file), repeat(top_k), repeat(min_v2))
+    if workers and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for part in executor.map(_extremes_segment, *args):
+                collector.merge(part)
+    else:
+        for part in map(_extremes_segment, *args):
+            collector.merge(part)
     
-    return {
-        'max_xor_dist_pair': max_xor_pair,
-        'v2_distribution': dict(sorted(v2_dist.items())),
-        'high_v2_twins': sorted(high_v2_twins, key=lambda x: -x[2])[:20],
-        'total_twins': len(twins)
-    }
+    return collector.result()
 
 
 # =============================================================================
 # RELATÓRIO COMPLETO
 # =============================================================================
 
-def generate_full_report(limit: int = 10**6) -> str:
+def generate_full_report(limit: int = 10**6,
+                         context: Optional[AnalysisContext] = None,
+                         trace_memory: bool = False,
+                         profile_dir: Optional[str] = None) -> str:
     """
     Gera um relatório completo de verificação.
+    
+    Teorema principal, distribuição e teste geométrico compartilham o mesmo
+    AnalysisContext: um único crivo e uma única passada sobre os gêmeos.
+    As etapas do teorema principal (crivo, gêmeos, xor_dist, verificação)
+    são medidas e listadas com tempo, itens/s e pico de memória.
+    
+    Args:
+        limit: Limite de verificação
+        context: Contexto de análise (substitui limit)
+        trace_memory: Medir memória com tracemalloc em vez do pico de RSS
+        profile_dir: Gravar um perfil cProfile (.prof) por etapa neste diretório
     """
+    if context is None:
+        context = AnalysisContext(limit)
+    limit = context.limit
+    
     lines = [
         "=" * 70,
         "RELATÓRIO DE VERIFICAÇÃO DO TEOREMA XOR_DIST",
@@ -375,8 +1051,11 @@ def generate_full_report(limit: int = 10**6) -> str:
     lines.append("\n" + "-" * 70)
     lines.append("1. TEOREMA PRINCIPAL (Primos Gêmeos)")
     lines.append("-" * 70)
-    result = verify_main_theorem(limit, verbose=False)
+    recorder = StageRecorder(trace_memory, profile_dir, prefix=f'main_{limit}_')
+    result = verify_main_theorem(verbose=False, context=context, recorder=recorder)
     lines.append(str(result))
+    lines.append("Etapas:")
+    lines.append(format_stages(result.stages))
     
     # Corolário (todos os ímpares)
     lines.append("\n" + "-" * 70)
@@ -392,6 +1071,28 @@ def generate_full_report(limit: int = 10**6) -> str:
     result = verify_trailing_ones_equivalence(min(limit, 10**5))
     lines.append(str(result))
     
+    # Distribuição de xor_dist nos gêmeos
+    lines.append("\n" + "-" * 70)
+    lines.append("4. DISTRIBUIÇÃO DE xor_dist (Primos Gêmeos)")
+    lines.append("-" * 70)
+    stats = context.stats
+    if stats:
+        geom = verify_geometric_distribution(context=context)
+        lines.append(f"Média:    {stats['mean']:.4f}")
+        lines.append(f"Desvio:   {stats['std']:.4f}")
+        lines.append(f"Entropia: {stats['entropy']:.4f} bits")
+        lines.append(f"Min/Max:  {stats['min']} / {stats['max']}")
+        lines.append(f"χ² Geom(1/2): {geom['chi_squared']:.2f} "
+                     f"(df {geom['degrees_of_freedom']}, p = {geom['p_value']:.4f}, "
+                     f"{'✓' if geom['is_geometric'] else '✗'})")
+    
+    # Primos de Mersenne
+    lines.append("\n" + "-" * 70)
+    lines.append("5. PRIMOS DE MERSENNE (Lucas–Lehmer, n ≤ 607)")
+    lines.append("-" * 70)
+    result = verify_mersenne_identities(607)
+    lines.append(str(result))
+    
     lines.append("\n" + "=" * 70)
     lines.append("FIM DO RELATÓRIO")
     lines.append("=" * 70)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+XOR_dist - Microbenchmark das Primitivas de Bits
+================================================
+
+Mede ns/op de popcount, xor_dist, v2, trailing_ones, odd_part e vp para
+cada backend disponível, com entradas pequenas, de 64 bits e de milhares
+de bits.
+
+Uso:
+    python bench_primitives.py [--number N] [--repeat R]
+
+Autor: Thiago Fernandes Motta
+Data: Dezembro 2025
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'algorithms'))
+
+import core
+
+
+# Classes de entrada: nome -> número de bits
+INPUT_SIZES = {
+    'pequeno': 16,
+    '64 bits': 64,
+    '4096 bits': 4096,
+}
+
+# Quantidade de valores distintos por classe (percorridos em cada medição)
+SAMPLES = 256
+
+
+def make_inputs(bits: int, seed: int = 2025):
+    """Valores ímpares e pares aleatórios com o número de bits indicado."""
+    rng = random.Random(seed + bits)
+    odds = [rng.getrandbits(bits) | 1 | (1 << (bits - 1)) for _ in range(SAMPLES)]
+    # Pares com v₂ variado, para que v2/odd_part não caiam sempre no caso trivial
+    evens = [x << rng.randint(1, 24) for x in odds]
+    return odds, evens
+
+
+def operations(odds, evens):
+    """Operações medidas: nome -> (função, argumentos por chamada)."""
+    return {
+        'popcount': (core.popcount, [(x,) for x in odds]),
+        'xor_dist': (core.xor_dist, [(x, x + 2) for x in odds]),
+        'v2': (core.v2, [(x,) for x in evens]),
+        'trailing_ones': (core.trailing_ones, [(x,) for x in odds]),
+        'odd_part': (core.odd_part, [(x,) for x in evens]),
+        'vp(·, 3)': (core.vp, [(x * 3**7, 3) for x in odds]),
+    }
+
+
+def time_operation(func, args, number: int, repeat: int) -> float:
+    """Melhor tempo por chamada em nanossegundos."""
+    def run():
+        for a in args:
+            func(*a)
+    best = min(timeit.repeat(run, number=number, repeat=repeat))
+    return 1e9 * best / (number * len(args))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--number', type=int, default=200,
+                        help="passadas sobre as entradas por medição")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="medições por caso (vale a melhor)")
+    args = parser.parse_args(argv)
+    
+    default = core.get_backend()
+    print(f"Backend padrão: {default}")
+    print(f"{'backend':<10} {'entrada':<10} {'operação':<14} {'ns/op':>10}")
+    print("-" * 47)
+    
+    try:
+        for backend in core.available_backends():
+            core.set_backend(backend)
+            for label, bits in INPUT_SIZES.items():
+                odds, evens = make_inputs(bits)
+                for name, (func, calls) in operations(odds, evens).items():
+                    ns = time_operation(func, calls, args.number, args.repeat)
+                    print(f"{backend:<10} {label:<10} {name:<14} {ns:>10.1f}")
+    finally:
+        core.set_backend(default)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+XOR_dist - Suíte de Benchmarks
+==============================
+
+Mede os pontos de entrada do núcleo e da verificação (crivo, gêmeos pela
+lista de primos e pelo crivo da roda 6, contagem π₂, verificação em lote,
+estatísticas da distribuição, teorema principal e corolário) em várias
+escalas, com aquecimento e repetições, e grava JSON com os tempos e os
+metadados do ambiente. O subcomando compare confronta dois JSON e aponta
+regressões acima de um limiar.
+
+Uso:
+    python run_benchmarks.py run [--scales N ...] [--repeat R] [--warmup W]
+                                 [--only NOME ...] [-o saida.json]
+                                 [--baseline base.json]
+    python run_benchmarks.py compare base.json atual.json [--threshold 0.10]
+
+Autor: Thiago Fernandes Motta
+Data: Dezembro 2025
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'algorithms'))
+
+import core
+import verification
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional
+    np = None
+
+
+SCHEMA_VERSION = 1
+
+DEFAULT_SCALES = [10**5, 10**6, 10**7]
+
+
+# =============================================================================
+# CASOS
+# =============================================================================
+
+def _cases(scale: int):
+    """
+    Casos medidos numa escala: nome -> (preparo, execução, itens).
+    
+    O preparo roda fora da medição e devolve o argumento da execução;
+    itens é a quantidade processada, usada para o throughput.
+    """
+    def primes():
+        return core.sieve_of_eratosthenes(scale)
+    
+    def twins():
+        return core.twin_primes(primes())
+    
+    return {
+        'sieve_of_eratosthenes': (
+            lambda: scale, core.sieve_of_eratosthenes, lambda arg: scale),
+        'twin_primes': (
+            primes, core.twin_primes, len),
+        'wheel_twin_primes': (
+            lambda: scale, lambda n: list(core.wheel_twin_primes(n)), lambda arg: scale),
+        'count_twins': (
+            lambda: scale, core.count_twins, lambda arg: scale),
+        'verify_theorem_batch': (
+            twins, lambda t: core.verify_theorem_batch(t, verbose=False), len),
+        'distribution_stats': (
+            twins, core.distribution_stats, len),
+        'verify_main_theorem': (
+            lambda: scale,
+            lambda n: verification.verify_main_theorem(n, verbose=False),
+            lambda arg: scale),
+        'verify_corollary_all_odds': (
+            lambda: scale,
+            lambda n: verification.verify_corollary_all_odds(n, verbose=False),
+            lambda arg: scale // 2),
+    }
+
+
+CASE_NAMES = list(_cases(0))
+
+
+def _measure(func, arg, warmup: int, repeat: int):
+    """Tempos (s) de repeat execuções após warmup, com o GC desligado."""
+    for _ in range(warmup):
+        func(arg)
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            func(arg)
+            times.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return times
+
+
+# =============================================================================
+# AMBIENTE
+# =============================================================================
+
+def _git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT_DIR,
+                             capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def environment():
+    """Metadados do ambiente que influenciam os tempos."""
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__ if np is not None else None,
+        'backend': core.get_backend(),
+        'git_commit': _git_commit(),
+    }
+
+
+# =============================================================================
+# RUN / COMPARE
+# =============================================================================
+
+def run(scales, repeat: int = 5, warmup: int = 1, only=None, verbose: bool = True):
+    """
+    Executa a suíte.
+    
+    Returns:
+        Documento JSON (dict) com ambiente, configuração e resultados
+    """
+    results = []
+    for scale in scales:
+        for name, (setup, func, items) in _cases(scale).items():
+            if only and name not in only:
+                continue
+            arg = setup()
+            times = _measure(func, arg, warmup, repeat)
+            n_items = items(arg)
+            median = statistics.median(times)
+            results.append({
+                'name': name,
+                'scale': scale,
+                'items': n_items,
+                'times': times,
+                'min': min(times),
+                'median': median,
+                'mean': statistics.fmean(times),
+                'stdev': statistics.stdev(times) if len(times) > 1 else 0.0,
+                'throughput': n_items / median if median > 0 else None,
+            })
+            if verbose:
+                print(f"{name:<26} {scale:>14,} {median:>10.4f}s "
+                      f"(min {min(times):.4f}s, {len(times)}x)", file=sys.stderr)
+    
+    return {
+        'schema': SCHEMA_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'environment': environment(),
+        'config': {'scales': list(scales), 'repeat': repeat, 'warmup': warmup},
+        'results': results,
+    }
+
+
+def compare(baseline, current, threshold: float = 0.10):
+    """
+    Compara as medianas de dois documentos de run().
+    
+    Returns:
+        (linhas do relatório, lista de regressões (nome, escala, razão))
+    """
+    base = {(r['name'], r['scale']): r for r in baseline['results']}
+    lines = [f"{'caso':<26} {'escala':>14} {'base':>10} {'atual':>10} {'razão':>7}"]
+    regressions = []
+    
+    for r in current['results']:
+        key = (r['name'], r['scale'])
+        if key not in base:
+            continue
+        ratio = r['median'] / base[key]['median'] if base[key]['median'] > 0 else float('inf')
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = '  REGRESSÃO'
+            regressions.append((r['name'], r['scale'], ratio))
+        elif ratio < 1 - threshold:
+            flag = '  melhoria'
+        lines.append(f"{r['name']:<26} {r['scale']:>14,} {base[key]['median']:>9.4f}s "
+                     f"{r['median']:>9.4f}s {ratio:>7.2f}{flag}")
+    
+    # O commit muda por definição; o resto do ambiente deveria ser o mesmo
+    env_base, env_cur = baseline.get('environment', {}), current.get('environment', {})
+    differing = sorted(k for k in env_base.keys() | env_cur.keys()
+                       if k != 'git_commit' and env_base.get(k) != env_cur.get(k))
+    if differing:
+        lines.append(f"Aviso: ambientes diferentes ({', '.join(differing)})")
+    return lines, regressions
+
+
+def _load(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    sub = parser.add_subparsers(dest='command', required=True)
+    
+    run_parser = sub.add_parser('run', help="executa a suíte e grava JSON")
+    run_parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES,
+                            metavar='N', help="limites medidos (padrão: 10^5 10^6 10^7)")
+    run_parser.add_argument('--repeat', type=int, default=5,
+                            help="execuções medidas por caso")
+    run_parser.add_argument('--warmup', type=int, default=1,
+                            help="execuções de aquecimento por caso")
+    run_parser.add_argument('--only', nargs='+', choices=CASE_NAMES, metavar='CASO',
+                            help=f"apenas estes casos ({', '.join(CASE_NAMES)})")
+    run_parser.add_argument('-o', '--output',
+                            help="arquivo JSON de saída (padrão: stdout)")
+    run_parser.add_argument('--baseline',
+                            help="comparar com este JSON ao final")
+    run_parser.add_argument('--threshold', type=float, default=0.10,
+                            help="razão de mediana acima de 1+limiar é regressão")
+    
+    cmp_parser = sub.add_parser('compare', help="compara dois JSON de resultados")
+    cmp_parser.add_argument('baseline')
+    cmp_parser.add_argument('current')
+    cmp_parser.add_argument('--threshold', type=float, default=0.10,
+                            help="razão de mediana acima de 1+limiar é regressão")
+    
+    args = parser.parse_args(argv)
+    
+    if args.command == 'run':
+        report = run(args.scales, args.repeat, args.warmup, args.only)
+        text = json.dumps(report, indent=2)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(text + '\n')
+        else:
+            print(text)
+        if not args.baseline:
+            return 0
+        baseline, current = _load(args.baseline), report
+    else:
+        baseline, current = _load(args.baseline), _load(args.current)
+    
+    lines, regressions = compare(baseline, current, args.threshold)
+    print('\n'.join(lines), file=sys.stderr if args.command == 'run' else sys.stdout)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
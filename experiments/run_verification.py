@@ -6,16 +6,20 @@ XOR_dist - Script de Verificação Principal
 Execute este script para verificar o teorema do xor_dist.
 
 Uso:
-    python run_verification.py [limit]
+    python run_verification.py [limit] [--jobs N] [--cache-dir DIR | --no-cache]
+    python run_verification.py LIMIT --start A    # Apenas a janela [A, LIMIT]
     
 Exemplos:
-    python run_verification.py           # Até 10^6
-    python run_verification.py 10000000  # Até 10^7
+    python run_verification.py                    # Até 10^6
+    python run_verification.py 10000000           # Até 10^7
+    python run_verification.py 10000000000 -j 64  # Até 10^10 em 64 processos
+    python run_verification.py 1000000010000000000 --start 1000000000000000000
 
 Autor: Thiago Fernandes Motta
 Data: Dezembro 2025
 """
 
+import argparse
 import sys
 import os
 
@@ -25,31 +29,117 @@ sys.path.insert(0, ROOT_DIR)
 sys.path.insert(0, os.path.join(ROOT_DIR, 'algorithms'))
 
 from algorithms.core import (
-    sieve_of_eratosthenes, twin_primes, xor_dist, v2,
-    demonstrate_theorem, distribution_stats, high_xor_dist_twins
+    xor_dist, v2,
+    demonstrate_theorem, high_xor_dist_twins,
+    high_v2_twins, DistributionAccumulator
 )
+from algorithms.storage import DEFAULT_CACHE_DIR, checkpoint_path, export_dataset
+from algorithms.context import AnalysisContext
+from algorithms.instrumentation import StageRecorder, format_stages
 from algorithms.verification import (
     verify_main_theorem, verify_corollary_all_odds,
-    verify_geometric_distribution, verify_by_gap,
-    find_extreme_cases, generate_full_report
+    verify_geometric_distribution, verify_geometric_multiscale, verify_by_gap,
+    verify_large_twins, twin_prime_count,
+    generate_full_report
 )
 
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Verifica o teorema xor_dist(p, p+2) = v₂(p+1)."
+    )
+    parser.add_argument('limit', nargs='?', type=int, default=10**6,
+                        help="limite superior (padrão: 10^6)")
+    parser.add_argument('--start', type=int, default=0,
+                        help="verificar apenas a janela [start, limit], sem crivar a partir de 2")
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help="processos para a verificação (0 = todos os núcleos)")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help="diretório do cache de crivos (padrão: data/)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="não ler nem gravar o cache de crivos")
+    parser.add_argument('--checkpoint', action='store_true',
+                        help="gravar checkpoints periódicos da etapa 1 no diretório do cache")
+    parser.add_argument('--resume', action='store_true',
+                        help="retomar a etapa 1 do último checkpoint (implica --checkpoint)")
+    parser.add_argument('--stages', action='store_true',
+                        help="medir tempo, itens/s e pico de memória de cada etapa da verificação")
+    parser.add_argument('--profile-dir',
+                        help="gravar um perfil cProfile (.prof) por etapa neste diretório (implica --stages)")
+    parser.add_argument('--export', action='store_true',
+                        help="exportar primos, gêmeos, xor_dist, v₂ e gaps como .npy no diretório do cache")
+    parser.add_argument('--large-bits', type=int, nargs='+', default=[], metavar='BITS',
+                        help="verificar gêmeos aleatórios com estes tamanhos em bits (ex.: 256 1024 4096)")
+    parser.add_argument('--large-samples', type=int, default=4,
+                        help="gêmeos sorteados por tamanho em --large-bits (padrão: 4)")
+    parser.add_argument('--count-twins', type=int, nargs='+', default=[], metavar='X',
+                        help="π₂(X) com a previsão de Hardy–Littlewood (tabela persistente no diretório do cache)")
+    parser.add_argument('--high-v2-limit', type=int, default=0,
+                        help="busca direcionada dos 10 gêmeos de maior v₂ até este limite")
+    parser.add_argument('--geometric-checkpoints', type=int, nargs='+', default=[],
+                        metavar='N',
+                        help="teste χ² de Geom(1/2) em cada limite N, numa única passada")
+    args = parser.parse_args(argv)
+    if args.no_cache:
+        # Exportação e checkpoints gravam no diretório do cache
+        for flag, used in (('--export', args.export), ('--checkpoint', args.checkpoint),
+                           ('--resume', args.resume)):
+            if used:
+                parser.error(f"{flag} grava no diretório do cache; não combine com --no-cache")
+    return args
+
+
+def verify_interval(args):
+    """Teorema e casos extremos apenas na janela [args.start, args.limit]."""
+    print("-" * 70)
+    print(f"Verificação na janela [{args.start:,}, {args.limit:,}]")
+    print("-" * 70)
+    result = verify_main_theorem(args.limit, workers=args.jobs, start=args.start)
+    print(result)
+    if not result.is_proven:
+        print("\n⚠️  ATENÇÃO: Contra-exemplos encontrados!")
+        for ce in result.counterexamples[:5]:
+            print(f"  p = {ce['p']}: xor_dist = {ce['xor_dist']}, v₂ = {ce['v2_p_plus_1']}")
+        return
+    
+    print(f"\nTop 10 twins com alto xor_dist:")
+    for p, q, d in result.extremes['high_v2_twins'][:10]:
+        print(f"  ({p:>7}, {q:>7}): xor_dist = v₂({p+1}) = {d}")
+
+
 def main():
     # Parse argumentos
-    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 10**6
+    args = parse_args()
+    limit = args.limit
+    cache_dir = None if args.no_cache else args.cache_dir
+    context = AnalysisContext(limit, cache_dir=cache_dir)
     
     print("=" * 70)
     print("VERIFICAÇÃO DO TEOREMA XOR_DIST DE MOTTA (2025)")
     print("=" * 70)
     print(f"\nTeorema: xor_dist(p, p+2) = v₂(p+1) para primos gêmeos\n")
     
+    if args.start > 0:
+        verify_interval(args)
+        return
+    
     # 1. Verificação principal
     print("-" * 70)
     print("ETAPA 1: Verificação do Teorema Principal")
     print("-" * 70)
-    result = verify_main_theorem(limit)
+    checkpoint = None
+    if args.checkpoint or args.resume:
+        checkpoint = checkpoint_path('main_theorem', limit, args.cache_dir)
+    recorder = None
+    if args.stages or args.profile_dir:
+        recorder = StageRecorder(profile_dir=args.profile_dir, prefix=f'main_{limit}_')
+    result = verify_main_theorem(limit, workers=args.jobs, context=context,
+                                 checkpoint=checkpoint, resume=args.resume,
+                                 recorder=recorder)
     print(result)
+    if recorder is not None:
+        print("Etapas:")
+        print(format_stages(result.stages))
     
     if not result.is_proven:
         print("\n⚠️  ATENÇÃO: Contra-exemplos encontrados!")
@@ -71,11 +161,12 @@ def main():
     print("ETAPA 3: Análise da Distribuição")
     print("-" * 70)
     
-    primes = sieve_of_eratosthenes(limit)
-    twins = twin_primes(primes)
-    stats = distribution_stats(twins)
+    # Histograma e extremos vêm da própria etapa 1 (serial, em processos ou
+    # retomada de checkpoint), sem refazer o crivo nem guardar os pares
+    n_twins = result.total_cases
+    stats = DistributionAccumulator().update_histogram(result.distribution).result()
     
-    print(f"\nEstatísticas para {len(twins):,} pares de gêmeos:")
+    print(f"\nEstatísticas para {n_twins:,} pares de gêmeos:")
     print(f"  Média:    {stats['mean']:.4f}")
     print(f"  Desvio:   {stats['std']:.4f}")
     print(f"  Entropia: {stats['entropy']:.4f} bits")
@@ -85,7 +176,7 @@ def main():
     print(f"  {'k':>3} | {'Observado':>10} | {'Frequência':>10} | {'Teórico (2^-k)':>14}")
     print("  " + "-" * 45)
     for k, count in sorted(stats['distribution'].items())[:10]:
-        freq = count / len(twins)
+        freq = count / n_twins
         teorico = 2**(-k)
         print(f"  {k:>3} | {count:>10,} | {freq:>10.4f} | {teorico:>14.4f}")
     
@@ -94,19 +185,24 @@ def main():
     print("ETAPA 4: Teste de Distribuição Geométrica")
     print("-" * 70)
     
-    geom_result = verify_geometric_distribution(twins)
+    geom_result = verify_geometric_distribution(observed=result.distribution)
     print(f"\nTeste χ² para Geom(1/2):")
     print(f"  χ² calculado:     {geom_result['chi_squared']:.2f}")
     print(f"  Valor crítico:    {geom_result['critical_value']:.2f}")
     print(f"  Graus liberdade:  {geom_result['degrees_of_freedom']}")
+    print(f"  p-valor:          {geom_result['p_value']:.4f}")
     print(f"  Resultado:        {'✓ É Geom(1/2)' if geom_result['is_geometric'] else '✗ Não é Geom(1/2)'}")
     
+    if args.geometric_checkpoints:
+        print(f"\nTeste χ² em várias escalas (uma passada):")
+        verify_geometric_multiscale(args.geometric_checkpoints, cache_dir=cache_dir)
+    
     # 5. Casos extremos
     print("\n" + "-" * 70)
     print("ETAPA 5: Casos Extremos")
     print("-" * 70)
     
-    extremes = find_extreme_cases(limit)
+    extremes = result.extremes
     
     if extremes['max_xor_dist_pair']:
         p, q, d = extremes['max_xor_dist_pair']
@@ -119,13 +215,33 @@ def main():
     for p, q, d in extremes['high_v2_twins'][:10]:
         print(f"  ({p:>7}, {q:>7}): xor_dist = v₂({p+1}) = {d}")
     
+    if args.high_v2_limit:
+        print(f"\nBusca direcionada (p ≡ 2^k - 1 mod 2^k) até {args.high_v2_limit:,}:")
+        for p, q, d in high_v2_twins(args.high_v2_limit, top_k=10):
+            print(f"  ({p:>13}, {q:>13}): xor_dist = v₂({p+1}) = {d}")
+    
+    if args.large_bits:
+        print(f"\nGêmeos aleatórios de tamanho criptográfico ({args.large_samples} por tamanho):")
+        large = verify_large_twins(args.large_bits, args.large_samples, workers=args.jobs)
+        if not all(r.is_proven for r in large.values()):
+            print("\n⚠️  ATENÇÃO: Contra-exemplos encontrados!")
+    
+    if args.count_twins:
+        print(f"\nContagem de gêmeos π₂(x):")
+        for x in args.count_twins:
+            twin_prime_count(x, cache_dir=cache_dir, workers=args.jobs)
+    
+    if args.export:
+        path = export_dataset(limit, args.cache_dir)
+        print(f"\nDados exportados em {path}")
+    
     # 6. Conclusão
     print("\n" + "=" * 70)
     print("CONCLUSÃO")
     print("=" * 70)
     print(f"""
 O teorema xor_dist(p, p+2) = v₂(p+1) foi VERIFICADO com sucesso
-para todos os {len(twins):,} pares de primos gêmeos até {limit:,}.
+para todos os {n_twins:,} pares de primos gêmeos até {limit:,}.
 
 Taxa de verificação: 100.0000%
 